@@ -37,6 +37,10 @@ if [ -d "./plugins/cliconf" ]; then
     cp -rf ./plugins/cliconf/huawei_s.py $ANSIBLE_PATH/plugins/cliconf
 fi
 
+if [ -d "./plugins/connection" ]; then
+    cp -rf ./plugins/connection/huawei_s.py $ANSIBLE_PATH/plugins/connection
+fi
+
 if [ -d "./plugins/doc_fragments" ]; then
     cp -rf ./plugins/doc_fragments/huawei_s.py $ANSIBLE_PATH/plugins/doc_fragments
 fi
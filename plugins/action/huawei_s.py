@@ -19,17 +19,22 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-import re
+import os
 import sys
 import copy
+import json
+import hashlib
 
-from ansible.module_utils._text import to_text
+from ansible import constants as C
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six.moves import cPickle
 from ansible.module_utils.connection import Connection, ConnectionError
 from ansible.plugins.action.network import ActionModule as ActionNetworkModule
 from ansible.module_utils.network.common.utils import load_provider
 from ansible.module_utils.network.huawei_s.huawei_s import huawei_s_provider_spec
 
 from ansible.utils.display import Display
+from ansible.utils.path import unfrackpath
 
 display = Display()
 
@@ -41,17 +46,23 @@ class ActionModule(ActionNetworkModule):
 
         module_name = self._task.action.split('.')[-1]
         self._config_module = True if module_name == 'huawei_s_config' else False
-        socket_path = None
 
-        if self._play_context.connection == 'network_cli':
+        if self._play_context.connection in ('network_cli', 'huawei_s'):
             provider = self._task.args.get('provider', {})
             if any(provider.values()):
-                display.warning('provider is unnecessary when using network_cli and will be ignored')
+                display.warning('provider is unnecessary when using %s and will be ignored' % self._play_context.connection)
                 del self._task.args['provider']
         elif self._play_context.connection == 'local':
             provider = load_provider(huawei_s_provider_spec, self._task.args)
+            # provider tasks keep using network_cli unless the huawei_s
+            # connection is asked for
+            connection_type = task_vars.get('ansible_huawei_s_provider_connection', 'network_cli')
+            if connection_type not in ('network_cli', 'huawei_s'):
+                return {'failed': True, 'msg': 'ansible_huawei_s_provider_connection must be network_cli or huawei_s'}
+            command_timeout = int(provider['timeout']) if provider['timeout'] else C.PERSISTENT_COMMAND_TIMEOUT
+
             pc = copy.deepcopy(self._play_context)
-            pc.connection = 'network_cli'
+            pc.connection = connection_type
             pc.network_os = 'huawei_s'
             pc.remote_addr = provider['host'] or self._play_context.remote_addr
             pc.port = int(provider['port'] or self._play_context.port or 22)
@@ -63,13 +74,16 @@ class ActionModule(ActionNetworkModule):
                 pc.become_method = 'enable'
             pc.become_pass = provider['auth_pass']
 
-            display.vvv('using connection plugin %s (was local)' % pc.connection, pc.remote_addr)
-            connection = self._shared_loader_obj.connection_loader.get('persistent', pc, sys.stdin)
-
-            command_timeout = int(provider['timeout']) if provider['timeout'] else connection.get_option('persistent_command_timeout')
-            connection.set_options(direct={'persistent_command_timeout': command_timeout})
+            key_path = self._get_socket_key_path(pc)
+            socket_path = self._reuse_socket(key_path, pc, command_timeout)
+            if socket_path is None:
+                display.vvv('using connection plugin %s (was local)' % pc.connection, pc.remote_addr)
+                connection = self._shared_loader_obj.connection_loader.get('persistent', pc, sys.stdin)
+                connection.set_options(direct={'persistent_command_timeout': command_timeout})
 
-            socket_path = connection.run()
+                socket_path = connection.run()
+                if socket_path:
+                    self._record_socket(key_path, socket_path)
             display.vvvv('socket_path: %s' % socket_path, pc.remote_addr)
             if not socket_path:
                 return {'failed': True,
@@ -80,19 +94,57 @@ class ActionModule(ActionNetworkModule):
         else:
             return {'failed': True, 'msg': 'Connection type %s is not valid for this module' % self._play_context.connection}
 
-        # make sure we are in the right cli context which should be
-        # enable mode and not config module
-        if socket_path is None:
-            socket_path = self._connection.socket_path
+        # the cliconf hands the session back in user view after every rpc,
+        # so there is no need to check the cli context before the module runs
+        result = super(ActionModule, self).run(task_vars=task_vars)
+        return result
+
+    def _get_socket_key_path(self, pc):
+        """
+        Path of the file recording the socket opened for a provider connection
+        in this playbook run. The worker process of every task is forked, so
+        the persistent control path directory is the registry shared by the
+        tasks. The key covers the key file and the credentials the session was
+        authenticated with, a task with other ones goes through
+        ansible-connection again instead of being handed the open socket.
+        """
+        key = json.dumps([pc.remote_addr, pc.port, pc.remote_user, pc.connection, pc.private_key_file,
+                          pc.password, pc.become, pc.become_pass, os.getppid()])
+        digest = hashlib.sha1(to_bytes(key, errors='surrogate_or_strict')).hexdigest()
+        return unfrackpath('%s/.huawei_s_socket_%s' % (C.PERSISTENT_CONTROL_PATH_DIR, digest))
+
+    def _record_socket(self, key_path, socket_path):
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(socket_path)
+        except (IOError, OSError) as exc:
+            display.vvvv('unable to record socket %s: %s' % (socket_path, to_text(exc)))
+
+    def _reuse_socket(self, key_path, pc, command_timeout):
+        """
+        Hand the socket recorded for the key to the task, updated the way
+        ansible-connection updates an existing connection
+        :returns: The socket path or None if there is no connection to reuse
+        """
+        try:
+            with open(key_path) as f:
+                socket_path = f.read().strip()
+        except (IOError, OSError):
+            return None
+        if not os.path.exists(socket_path):
+            return None
 
         conn = Connection(socket_path)
         try:
-            out = conn.get_prompt()
-            if re.search(r'\[.*\]', to_text(out, errors='surrogate_then_replace').strip()):
-                display.vvvv('wrong context, sending end to device', self._play_context.remote_addr)
-                conn.send_command('return')
+            # set_options fails if the connection daemon is already gone,
+            # update_play_context also reaches the paramiko connection used
+            # for file transfers and resets the command history
+            conn.set_options(var_options={'ansible_command_timeout': command_timeout})
+            conn.update_play_context(to_text(cPickle.dumps(pc.serialize(), protocol=0), errors='surrogate_or_strict'))
+            conn.set_check_prompt(self._task._uuid)
         except ConnectionError as exc:
-            return {'failed': True, 'msg': to_text(exc)}
-
-        result = super(ActionModule, self).run(task_vars=task_vars)
-        return result
+            display.vvvv('unable to reuse socket %s: %s' % (socket_path, to_text(exc)))
+            return None
+        display.vvvv('reusing persistent connection socket %s' % socket_path)
+        return socket_path
@@ -28,23 +28,188 @@ description:
   - This huawei_s plugin provides low level abstraction apis for
     sending and receiving CLI commands from Huawei S series network devices.
 version_added: "2.9"
+options:
+  huawei_s_pipeline_window:
+    type: int
+    default: 1
+    description:
+      - Number of configuration lines or display commands written to the
+        device in a single channel write.  The device prompt is only waited
+        for at the end of every window, the combined output is split back
+        into one response per command and an error is reported against the
+        exact line that caused it.
+      - The default of C(1) sends every command separately and waits for its
+        prompt before sending the next one.
+      - Lines of a window following a failing line have already been sent
+        to the device when the error is detected.
+      - Commands are sent one by one when C(screen-length 0 temporary) was
+        rejected by the device and the output is paged.
+    env:
+      - name: ANSIBLE_HUAWEI_S_PIPELINE_WINDOW
+    vars:
+      - name: ansible_huawei_s_pipeline_window
+  huawei_s_config_cache:
+    type: boolean
+    default: no
+    description:
+      - Keep the running configuration fetched from the device for the life
+        of the persistent connection.  Later get_config requests for the
+        running configuration, including C(| include), C(| exclude) and
+        C(| begin) filtered views, are served from the kept copy.  Commands
+        run through run_commands, like the ones of huawei_s_command, are
+        always sent to the device.
+      - The copy is dropped whenever configuration is loaded through the
+        connection or a command other than a display command is run.  It does
+        not see changes made by other sessions, only enable it when the
+        connection is the only one changing the device.
+      - Without it, resource modules still keep the outputs of their display
+        commands for the run of the module only.
+    env:
+      - name: ANSIBLE_HUAWEI_S_CONFIG_CACHE
+    vars:
+      - name: ansible_huawei_s_config_cache
+  huawei_s_config_cache_dir:
+    type: path
+    description:
+      - Directory where the running configuration of every device is stored
+        together with the fingerprint of the device configuration state, so
+        that later playbook runs can reuse it.  Requires
+        I(huawei_s_config_change_probe).
+      - The stored files contain the device configuration and are only
+        readable by their owner.
+    env:
+      - name: ANSIBLE_HUAWEI_S_CONFIG_CACHE_DIR
+    vars:
+      - name: ansible_huawei_s_config_cache_dir
+  huawei_s_config_change_probe:
+    type: str
+    description:
+      - Command whose output changes whenever the device configuration
+        changes, for example a command displaying the configuration change
+        timestamp or the configuration commit list.  Its output is compared
+        with the one stored in I(huawei_s_config_cache_dir) before fetching
+        the running configuration, the stored configuration is used when
+        they match.
+    env:
+      - name: ANSIBLE_HUAWEI_S_CONFIG_CHANGE_PROBE
+    vars:
+      - name: ansible_huawei_s_config_change_probe
+  huawei_s_file_load_threshold:
+    type: int
+    default: 0
+    description:
+      - Minimum number of candidate lines for which the configuration is
+        transferred to the device flash as a batch file and run with a single
+        C(execute) command instead of being sent line by line.  Failures are
+        reported against the candidate lines that caused them.
+      - Requires the SFTP or SCP server to be enabled on the device for the
+        connection user.  The default of C(0) never uses a file.
+    env:
+      - name: ANSIBLE_HUAWEI_S_FILE_LOAD_THRESHOLD
+    vars:
+      - name: ansible_huawei_s_file_load_threshold
+  huawei_s_file_transfer_proto:
+    type: str
+    default: sftp
+    choices: ['sftp', 'scp']
+    description:
+      - Protocol used to transfer the batch file when
+        I(huawei_s_file_load_threshold) is reached.
+    env:
+      - name: ANSIBLE_HUAWEI_S_FILE_TRANSFER_PROTO
+    vars:
+      - name: ansible_huawei_s_file_transfer_proto
+  huawei_s_rpc_compress_threshold:
+    type: int
+    default: 1048576
+    description:
+      - Size in bytes from which an output requested through a compressed
+        C(run_batch) is sent back to the module zlib compressed instead of
+        as plain text.  The module decompresses an output only when it uses
+        it.  C(0) never compresses.
+    env:
+      - name: ANSIBLE_HUAWEI_S_RPC_COMPRESS_THRESHOLD
+    vars:
+      - name: ansible_huawei_s_rpc_compress_threshold
+  huawei_s_facts_source:
+    type: str
+    default: display
+    choices: ['display', 'config']
+    description:
+      - Where the resource facts are read from.  With C(display) every
+        resource runs its own display command.  With C(config) the vlans,
+        l3_interfaces, lldp_interfaces, lag_interfaces and lacp_interfaces
+        facts are rendered from a single C(display current-configuration).
+        The l2_interfaces facts still come from C(display port vlan), the
+        link type of a port without C(port link-type) depends on the model
+        and on negotiation and is not part of the configuration.
+    env:
+      - name: ANSIBLE_HUAWEI_S_FACTS_SOURCE
+    vars:
+      - name: ansible_huawei_s_facts_source
 """
 
+import os
 import re
-import time
 import json
+import zlib
+import base64
+import socket
+import hashlib
+import tempfile
 
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common._collections_compat import Mapping
 from ansible.module_utils.six import iteritems
 from ansible.module_utils.network.common.config import NetworkConfig, dumps
 from ansible.module_utils.network.common.utils import to_list
+from ansible.module_utils.network.huawei_s.utils.config import ConfigIndex
 from ansible.plugins.cliconf import CliconfBase
+from ansible.plugins.terminal.huawei_s import TerminalModule
+
+# a user-view or system-view prompt at the start of a line, optionally
+# followed by the echo of the next command read by the device
+PROMPT_LINE_RE = re.compile(r'^(?:<[^<>\r\n]+>|\[[^\[\]\r\n]+\])(.*?)\r?$', re.M)
+PROMPT_START_RE = re.compile(r'^(?:<[^<>\r\n]+>|\[[^\[\]\r\n]+\])', re.M)
+PROMPT_END_RE = re.compile(br'(?:<[^<>\r\n]+>|\[[^\[\]\r\n]+\])\s*$')
+PROMPT_ECHO_RE = re.compile(br'^(?:\x1b\[[0-9;?]*[A-Za-z]|[^\x20-\x7e\n])*(?:<[^<>\r\n]+>|\[[^\[\]\r\n]+\])', re.M)
+
+# number of lines streamed per window when the device is in two-stage mode
+COMMIT_WINDOW = 50
+
+# name of the batch file used to load large candidates from the device flash
+LOAD_FILE = 'ansible_candidate.bat'
+
+# commands that never change the device configuration
+READ_ONLY_COMMANDS = ('display', 'dir', 'ping', 'tracert')
+
+# VT100 sequences and control characters the connection leaves in the
+# output, VRP prints the line breaks of a banner text as ESC EM
+OUTPUT_NOISE_RE = re.compile(br'\x1b\[[0-9;?]*[A-Za-z]|\x1b.?|[^\x08\r\n]?\x08|[\x00-\x07\x0b\x0c\x0e-\x1a\x1c-\x1f\x7f]')
+OUTPUT_NOISE_REPLACEMENTS = {b'\x1b\x19': b'\n'}
+
+# error of a device that does not know an output filter, any other failure
+# of a filtered fetch, like a timeout, says nothing about the syntax
+UNSUPPORTED_SYNTAX_RE = re.compile(r'Error:\s*(?:Unrecognized command|Wrong parameter) found at', re.I)
+
+# rpc methods that can be combined in a single run_batch exchange
+BATCH_METHODS = ('get', 'run_commands', 'get_config')
 
 
 class Cliconf(CliconfBase):
 
+    def __init__(self, *args, **kwargs):
+        super(Cliconf, self).__init__(*args, **kwargs)
+        self._device_info = None
+        self._defaults_flag = None
+        self._syntax_support = {}
+        self._running_config = None
+        self._config_trees = {}
+        self._config_index = None
+        self._two_stage = None
+        self._session_shell = None
+
     def get_config(self, source='running', flags=None, format=None):
         if source not in ('running', 'startup'):
             raise ValueError("fetching configuration from %s is not supported" % source)
@@ -59,10 +224,42 @@ class Cliconf(CliconfBase):
         else:
             cmd = 'display saved-configuration '
 
-        cmd += ' '.join(to_list(flags))
+        flags = to_list(flags)
+        if source == 'running':
+            out = self._get_cached_config(flags)
+            if out is not None:
+                return out
+
+        fingerprint = None
+        if source == 'running' and not flags:
+            fingerprint = self._get_config_fingerprint()
+            out = self._load_stored_config(fingerprint)
+            if out is not None:
+                if self.get_option('huawei_s_config_cache'):
+                    self._running_config = out
+                return out
+
+        pipe = self._get_pipe(flags[-1]) if flags else None
+        if pipe and self._syntax_support.get(pipe) is False:
+            raise AnsibleConnectionFailure("output filter '| %s' is not supported by the device" % pipe)
+
+        cmd += ' '.join(flags)
         cmd = cmd.strip()
 
-        return self.send_command(cmd)
+        try:
+            out = self.send_command(cmd)
+        except AnsibleConnectionFailure as exc:
+            if pipe and UNSUPPORTED_SYNTAX_RE.search(to_text(exc, errors='surrogate_then_replace')):
+                self._syntax_support[pipe] = False
+            raise
+
+        if pipe:
+            self._syntax_support[pipe] = True
+        if source == 'running' and not flags:
+            if self.get_option('huawei_s_config_cache'):
+                self._running_config = out
+            self._store_config(fingerprint, out)
+        return out
 
     def get_diff(self, candidate=None, running=None, diff_match='line', diff_ignore_lines=None, path=None, diff_replace='line'):
         """
@@ -119,8 +316,7 @@ class Cliconf(CliconfBase):
 
         if running and diff_match != 'none':
             # running configuration
-            have_src, have_banners = self._extract_banners(running)
-            running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
+            running_obj, have_banners = self._get_config_tree(running, diff_ignore_lines)
             configdiffobjs = candidate_obj.difference(running_obj, path=path, match=diff_match, replace=diff_replace)
 
         else:
@@ -137,22 +333,72 @@ class Cliconf(CliconfBase):
         operations = self.get_device_operations()
         self.check_edit_config_capability(operations, candidate, commit, replace, comment)
 
+        if not commit and not operations['supports_commit']:
+            raise ValueError('check mode is not supported')
+
         results = []
         requests = []
         if commit:
-            self.send_command('mmi-mode enable\rscreen-length 0 temporary\rsystem-view')
+            self._running_config = None
+        window_size = self.get_option('huawei_s_pipeline_window') or 1
+        window = []
+        load_file = self._use_load_file(candidate)
+        self._enter_system_view()
+
+        # in two-stage mode nothing takes effect before the commit, so the
+        # candidate can be streamed without waiting for every line
+        self._two_stage = self._is_two_stage_view()
+        if self._two_stage:
+            window_size = max(window_size, COMMIT_WINDOW)
+        if not self._pipelining_allowed():
+            window_size = 1
+
+        try:
+            if load_file:
+                lines = [line for line in to_list(candidate) if line != 'return' and line[0] != '!']
+                results.append(self._load_file(lines))
+                requests.extend(lines)
+                candidate = []
+
             for line in to_list(candidate):
                 if not isinstance(line, Mapping):
                     line = {'command': line}
 
                 cmd = line['command']
                 if cmd != 'return' and cmd[0] != '!':
-                    results.append(self.send_command(**line))
-                    requests.append(cmd)
+                    if window_size > 1 and len(line) == 1:
+                        window.append(cmd)
+                        if len(window) == window_size:
+                            results.extend(self._edit_window(window, len(requests)))
+                            requests.extend(window)
+                            window = []
+                    else:
+                        results.extend(self._edit_window(window, len(requests)))
+                        requests.extend(window)
+                        window = []
+                        results.append(self.send_command(**line))
+                        requests.append(cmd)
 
-            self.send_command('return')
-        else:
-            raise ValueError('check mode is not supported')
+            results.extend(self._edit_window(window, len(requests)))
+            requests.extend(window)
+
+            if self._two_stage:
+                if commit:
+                    results.append(self.send_command('commit'))
+                    requests.append('commit')
+                else:
+                    self.send_command('clear configuration candidate')
+        except AnsibleConnectionFailure:
+            if self._two_stage:
+                self._discard_candidate()
+            if load_file:
+                self._delete_load_file()
+            self._return_to_user_view()
+            raise
+
+        self.send_command('return')
+        if load_file:
+            self._delete_load_file()
 
         resp['request'] = requests
         resp['response'] = results
@@ -161,72 +407,97 @@ class Cliconf(CliconfBase):
     def edit_macro(self, candidate=None, commit=True, replace=None, comment=None):
         resp = {}
         operations = self.get_device_operations()
-        self.check_edit_config_capabiltiy(operations, candidate, commit, replace, comment)
+        self.check_edit_config_capability(operations, candidate, commit, replace, comment)
 
         results = []
         requests = []
         if commit:
-            commands = ''
-            for line in candidate:
-                if line != 'None':
-                    commands += (' ' + line + '\n')
-                self.send_command('system-view', sendonly=True)
-                obj = {'command': commands, 'sendonly': True}
-                results.append(self.send_command(**obj))
-                requests.append(commands)
-
-            self.send_command('return', sendonly=True)
-            time.sleep(0.1)
-            results.append(self.send_command('\n'))
-            requests.append('\n')
+            self._running_config = None
+            self._enter_system_view()
+            self._two_stage = self._is_two_stage_view()
+
+            commands = [line for line in candidate if line != 'None']
+            try:
+                results.append(self._send_multiline(commands))
+                requests.extend(commands)
+
+                if self._two_stage:
+                    results.append(self.send_command('commit'))
+                    requests.append('commit')
+            finally:
+                self._return_to_user_view()
 
         resp['request'] = requests
         resp['response'] = results
         return resp
 
+    def send_command(self, command=None, **kwargs):
+        """
+        Executes a command over the device connection
+        :return: The output of the command as text, cleaned in a single pass
+                 over the bytes from the terminal artifacts listed in OUTPUT_NOISE_RE
+        """
+        return self._sanitize(super(Cliconf, self).send_command(command, **kwargs))
+
     def get(self, command=None, prompt=None, answer=None, sendonly=False, output=None, newline=True, check_all=False):
         if not command:
             raise ValueError('must provide value of command to execute')
         if output:
             raise ValueError("'output' value %s is not supported for get" % output)
 
-        return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all)
+        self._check_read_only(command)
+        try:
+            return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all)
+        finally:
+            self._return_to_user_view()
 
     def get_device_info(self):
-        device_info = {}
+        if self._device_info is None:
+            device_info = {}
 
-        device_info['network_os'] = 'huawei_s'
-        reply = self.get(command='display version')
-        reply_hostname = self.get(command='display current-configuration | include sysname')
-        data = to_text(reply, errors='surrogate_or_strict').strip()
-        data_hostname = to_text(reply_hostname, errors='surrogate_or_strict').strip()
+            device_info['network_os'] = 'huawei_s'
+            reply = self.get(command='display version')
+            data = to_text(reply, errors='surrogate_or_strict').strip()
 
-        match = re.search(r'\(\S+\s+(\S+)\)', data)
-        if match:
-            device_info['network_os_version'] = match.group(1).strip(',')
+            match = re.search(r'\(\S+\s+(\S+)\)', data)
+            if match:
+                device_info['network_os_version'] = match.group(1).strip(',')
 
-        model_search_strs = [r'^\s*HUAWEI\s+(\S+)\s+.*$']
-        for item in model_search_strs:
-            match = re.search(item, data, re.M)
+            model_search_strs = [r'^\s*HUAWEI\s+(\S+)\s+.*$']
+            for item in model_search_strs:
+                match = re.search(item, data, re.M)
+                if match:
+                    version = match.group(1).split(' ')
+                    device_info['network_os_model'] = version[0]
+                    break
+
+            match = re.search(r'\(\S+\s+(\S+)\)', data)
             if match:
-                version = match.group(1).split(' ')
-                device_info['network_os_model'] = version[0]
-                break
+                device_info['network_os_image'] = match.group(1)
 
-        match = re.search(r'^\s*sysname\s+(\S+)$', data_hostname, re.M)
-        if match:
-            device_info['network_os_hostname'] = match.group(1)
+            self._device_info = device_info
 
-        match = re.search(r'\(\S+\s+(\S+)\)', data)
+        device_info = dict(self._device_info)
+
+        # the user-view prompt carries the sysname, read it from there so the
+        # hostname stays current without scanning the running configuration
+        prompt = to_text(self._connection.get_prompt(), errors='surrogate_or_strict').strip()
+        match = re.match(r'^<([^<>\s]+)>$', prompt)
         if match:
-            device_info['network_os_image'] = match.group(1)
+            device_info['network_os_hostname'] = match.group(1)
+        else:
+            reply_hostname = self.get_config(flags=['| include sysname'])
+            data_hostname = to_text(reply_hostname, errors='surrogate_or_strict').strip()
+            match = re.search(r'^\s*sysname\s+(\S+)$', data_hostname, re.M)
+            if match:
+                device_info['network_os_hostname'] = match.group(1)
 
         return device_info
 
     def get_device_operations(self):
         return {
             'supports_diff_replace': True,
-            'supports_commit': False,
+            'supports_commit': self._probe_two_stage(),
             'supports_rollback': False,
             'supports_defaults': True,
             'supports_onbox_diff': False,
@@ -248,9 +519,10 @@ class Cliconf(CliconfBase):
 
     def get_capabilities(self):
         result = super(Cliconf, self).get_capabilities()
-        result['rpc'] += ['edit_banner', 'get_diff', 'run_commands', 'get_defaults_flag']
+        result['rpc'] += ['edit_banner', 'get_diff', 'run_commands', 'get_defaults_flag', 'get_syntax_support', 'run_batch']
         result['device_operations'] = self.get_device_operations()
         result.update(self.get_option_values())
+        result['facts_source'] = self.get_option('huawei_s_facts_source')
         return json.dumps(result)
 
     def edit_banner(self, candidate=None, multiline_delimiter="@", commit=True):
@@ -270,18 +542,21 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
-            for key, value in iteritems(banners_obj):
-                key += ' %s' % multiline_delimiter
-                self.send_command('system-view', sendonly=True)
-                for cmd in [key, value, multiline_delimiter]:
-                    obj = {'command': cmd, 'sendonly': True}
-                    results.append(self.send_command(**obj))
-                    requests.append(cmd)
-
-                self.send_command('end', sendonly=True)
-                time.sleep(0.1)
-                results.append(self.send_command('\n'))
-                requests.append('\n')
+            self._running_config = None
+            self._enter_system_view()
+            self._two_stage = self._is_two_stage_view()
+
+            try:
+                for key, value in iteritems(banners_obj):
+                    key += ' %s' % multiline_delimiter
+                    results.append(self._send_multiline([key] + value.splitlines() + [multiline_delimiter]))
+                    requests.extend([key, value, multiline_delimiter])
+
+                if self._two_stage:
+                    results.append(self.send_command('commit'))
+                    requests.append('commit')
+            finally:
+                self._return_to_user_view()
 
         resp['request'] = requests
         resp['response'] = results
@@ -292,44 +567,574 @@ class Cliconf(CliconfBase):
         if commands is None:
             raise ValueError("'commands' value is required")
 
+        window_size = self.get_option('huawei_s_pipeline_window') or 1
+        if not self._pipelining_allowed():
+            window_size = 1
+        window = []
         responses = list()
-        for cmd in to_list(commands):
-            if not isinstance(cmd, Mapping):
-                cmd = {'command': cmd}
+        try:
+            for cmd in to_list(commands):
+                if not isinstance(cmd, Mapping):
+                    cmd = {'command': cmd}
 
-            output = cmd.pop('output', None)
-            if output:
-                raise ValueError("'output' value %s is not supported for run_commands" % output)
+                output = cmd.pop('output', None)
+                if output:
+                    raise ValueError("'output' value %s is not supported for run_commands" % output)
 
-            try:
-                out = self.send_command(**cmd)
-            except AnsibleConnectionFailure as e:
-                if check_rc:
-                    raise
-                out = getattr(e, 'err', to_text(e))
+                if window_size > 1 and len(cmd) == 1:
+                    window.append(cmd['command'])
+                    if len(window) == window_size:
+                        responses.extend(self._run_window(window, check_rc))
+                        window = []
+                    continue
 
-            responses.append(out)
+                responses.extend(self._run_window(window, check_rc))
+                window = []
+                responses.append(self._run_command(cmd, check_rc))
 
+            responses.extend(self._run_window(window, check_rc))
+        finally:
+            self._return_to_user_view()
         return responses
 
+    def _run_command(self, cmd, check_rc=True):
+        command = cmd['command']
+        try:
+            # an explicit command always reaches the device, only get_config
+            # is served from the kept running configuration
+            self._check_read_only(command)
+            out = self.send_command(**cmd)
+        except AnsibleConnectionFailure as e:
+            if check_rc:
+                raise
+            out = getattr(e, 'err', to_text(e))
+        return out
+
+    def _run_window(self, window, check_rc=True):
+        """
+        Run a window of commands and return their responses
+        :param window: List of commands
+        :param check_rc: Raise if the response of a command is an error
+        :return: List of responses, one per command
+        """
+        if len(window) < 2:
+            return [self._run_command({'command': cmd}, check_rc) for cmd in window]
+
+        for cmd in window:
+            self._check_read_only(cmd)
+
+        responses = []
+        for cmd, (out, error) in zip(window, self._send_pipelined(window)):
+            if error and check_rc:
+                raise AnsibleConnectionFailure("command '%s' failed: %s" % (cmd, out))
+            responses.append(out)
+        return responses
+
+    def run_batch(self, requests=None, compress=False):
+        """
+        Execute several rpc calls in a single exchange with the connection
+        :param requests: List of dicts with the 'method' to call, one of
+                         BATCH_METHODS, and its keyword 'args'
+        :param compress: Send outputs reaching huawei_s_rpc_compress_threshold
+                         bytes zlib compressed, see _compress_output
+        :return: List of results, one per request and in the same order
+        """
+        if requests is None:
+            raise ValueError("'requests' value is required")
+
+        results = []
+        for request in requests:
+            method = request.get('method')
+            if method not in BATCH_METHODS:
+                raise ValueError("method '%s' is not supported in a batch" % method)
+            result = getattr(self, method)(**request.get('args', {}))
+            if isinstance(result, list):
+                result = [self._compress_output(to_text(item, errors='surrogate_then_replace'), compress) for item in result]
+            else:
+                result = self._compress_output(to_text(result, errors='surrogate_then_replace'), compress)
+            results.append(result)
+        return results
+
+    def _compress_output(self, output, compress=True):
+        """
+        A large output travels back to the module as a dict holding the base64
+        encoded zlib stream of its text, which is several times smaller than
+        the text itself for the repetitive output of display commands
+        """
+        threshold = self.get_option('huawei_s_rpc_compress_threshold')
+        if compress and threshold and len(output) >= threshold:
+            return {'zlib': to_text(base64.b64encode(zlib.compress(to_bytes(output, errors='surrogate_or_strict'))))}
+        return output
+
     def get_defaults_flag(self):
         """
         The method identifies the filter that should be used to fetch running-configuration
         with defaults.
         :return: valid default filter
         """
-        out = self.get('display current-configuration ?')
-        out = to_text(out, errors='surrogate_then_replace')
+        if self._defaults_flag is None:
+            out = self.get('display current-configuration ?')
+            out = to_text(out, errors='surrogate_then_replace')
 
-        commands = set()
-        for line in out.splitlines():
-            if line.strip():
-                commands.add(line.strip().split()[0])
+            commands = set()
+            for line in out.splitlines():
+                if line.strip():
+                    commands.add(line.strip().split()[0])
+
+            if 'all' in commands:
+                self._defaults_flag = 'all'
+            else:
+                self._defaults_flag = 'full'
+
+        return self._defaults_flag
+
+    def get_syntax_support(self):
+        """
+        Returns the syntax support discovered so far on the device
+        :return: Dictionary with the output filters (section, include, begin...)
+                 seen accepted (True) or rejected (False) by the device
+        """
+        return dict(self._syntax_support)
 
-        if 'all' in commands:
-            return 'all'
+    def _get_cached_config(self, flags):
+        """
+        Returns the running configuration kept by the connection, optionally
+        narrowed locally to a single interface view or by a single include,
+        exclude or begin output filter.
+        :param flags: List of get_config flags
+        :return: The configuration text or None if it has to be fetched from the device
+        """
+        if self._running_config is None or not self.get_option('huawei_s_config_cache'):
+            return None
+        if not flags:
+            return self._running_config
+        if len(flags) != 1:
+            return None
+
+        if self._config_index is None or self._config_index.config is not self._running_config:
+            self._config_index = ConfigIndex(self._running_config)
+
+        match = re.match(r'^\s*(interface\s+\S+)\s*$', flags[0])
+        if match:
+            return self._config_index.get_block(' '.join(match.group(1).split()))
+
+        match = re.match(r'^\s*\|\s*(include|exclude|begin)\s+(.+?)\s*$', flags[0])
+        if not match:
+            return None
+        try:
+            return self._config_index.filter(match.group(1), match.group(2))
+        except re.error:
+            return None
+
+    def _get_config_fingerprint(self):
+        """
+        Runs the configured change probe on the device
+        :return: SHA1 of the probe output or None if configuration storage is
+                 not enabled or the probe failed
+        """
+        probe = self.get_option('huawei_s_config_change_probe')
+        if not probe or not self.get_option('huawei_s_config_cache_dir'):
+            return None
+        try:
+            out = self.send_command(probe)
+        except AnsibleConnectionFailure:
+            return None
+        return hashlib.sha1(to_bytes(out, errors='surrogate_or_strict')).hexdigest()
+
+    def _get_stored_config_path(self):
+        play_context = self._connection._play_context
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (play_context.remote_addr, play_context.port or 22))
+        return os.path.join(self.get_option('huawei_s_config_cache_dir'), '%s.json' % name)
+
+    def _load_stored_config(self, fingerprint):
+        """
+        Returns the stored running configuration if it was stored with the same
+        fingerprint
+        """
+        if fingerprint is None:
+            return None
+        try:
+            with open(self._get_stored_config_path()) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('fingerprint') == fingerprint:
+            return data.get('config')
+
+    def _store_config(self, fingerprint, config):
+        if fingerprint is None:
+            return
+        path = self._get_stored_config_path()
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'fingerprint': fingerprint, 'config': to_text(config)}, f)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as exc:
+            self._connection.queue_message('warning', 'unable to store running configuration in %s: %s' % (path, to_text(exc)))
+
+    def _get_config_tree(self, config, ignore_lines=None):
+        """
+        Returns the parsed tree and the banners of a configuration. Trees are
+        kept by the SHA1 of the configuration so the same running configuration
+        is only parsed once per connection.
+        :param config: The configuration text
+        :param ignore_lines: Lines to ignore while parsing the configuration
+        :return: Tuple of the NetworkConfig object and the banners dictionary
+        """
+        key = hashlib.sha1(to_bytes('%s%r' % (config, ignore_lines), errors='surrogate_or_strict')).hexdigest()
+        if key not in self._config_trees:
+            if len(self._config_trees) >= 4:
+                self._config_trees.clear()
+            have_src, have_banners = self._extract_banners(config)
+            running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=ignore_lines)
+            self._config_trees[key] = (running_obj, have_banners)
+        return self._config_trees[key]
+
+    def _check_read_only(self, command):
+        """
+        Drops the kept running configuration if command may change it
+        """
+        if not to_text(command).strip().startswith(READ_ONLY_COMMANDS):
+            self._running_config = None
+
+    def _get_pipe(self, flag):
+        match = re.match(r'^\s*\|\s*(\w+)', flag)
+        if match:
+            return match.group(1)
+
+    def _sanitize(self, data):
+        if not data:
+            return data
+        data = OUTPUT_NOISE_RE.sub(lambda match: OUTPUT_NOISE_REPLACEMENTS.get(match.group(), b''), to_bytes(data, errors='surrogate_or_strict'))
+        # rpc results are serialized as json, they must be text like the
+        # output of network_cli
+        return to_text(data, errors='surrogate_then_replace')
+
+    def _get_prompt(self):
+        return to_text(self._connection.get_prompt(), errors='surrogate_then_replace').strip()
+
+    def _enter_system_view(self):
+        """
+        Enter system view sending only the commands the session still needs.
+        The terminal plugin sets the screen length when the shell is opened,
+        MMI mode is enabled once per shell and the current view is known
+        from the last prompt
+        """
+        commands = []
+        prompt = self._get_prompt()
+        if self._session_shell is not self._connection._ssh_shell:
+            commands.append('mmi-mode enable')
+        if not prompt.startswith('['):
+            commands.append('system-view')
+        if commands:
+            self.send_command('\r'.join(commands))
+        self._session_shell = self._connection._ssh_shell
+
+    def _return_to_user_view(self):
+        """
+        Every rpc hands the session back in user view, so a task can start
+        without checking the prompt first
+        """
+        try:
+            if self._get_prompt().startswith('['):
+                self.send_command('return')
+        except AnsibleConnectionFailure as exc:
+            self._connection.queue_message('vvvv', 'unable to return to user view: %s' % to_text(exc))
+
+    def _probe_two_stage(self):
+        """
+        The configuration mode only shows in the system-view prompt, enter
+        system view once per connection so that it is known before the first
+        edit
+        """
+        if self._two_stage is None:
+            try:
+                self._enter_system_view()
+                self._two_stage = self._is_two_stage_view()
+            except AnsibleConnectionFailure as exc:
+                self._connection.queue_message('vvvv', 'unable to probe the configuration mode: %s' % to_text(exc))
+            finally:
+                self._return_to_user_view()
+        return bool(self._two_stage)
+
+    def _is_two_stage_view(self):
+        """
+        The system-view prompt of a device in two-stage configuration mode
+        starts with '~', or with '*' when there are uncommitted changes
+        """
+        return self._get_prompt().startswith(('[~', '[*'))
+
+    def _send_multiline(self, lines):
+        """
+        Stream the lines of a multi-line command, like a banner text, in a
+        single channel write and wait for the device to come back to a
+        system-view prompt once it has read the whole body
+        :param lines: List of lines of the command
+        :return: Output of the command
+        """
+        # a body line looking like a prompt, like [WARNING], may end the
+        # receive early, only the prompt of the view the command was sent
+        # from tells that the device has read the whole body
+        prompt = self._view_prompt()
+        out = self.send_command('\r'.join(lines))
+        while self._view_prompt() != prompt:
+            out += '\n' + to_text(self._connection.receive(), errors='surrogate_then_replace')
+        return out
+
+    def _view_prompt(self):
+        """
+        The prompt without the two-stage configuration mode marker, which
+        turns from '~' to '*' with the first uncommitted change
+        """
+        return re.sub(r'^\[[~*]', '[', self._get_prompt())
+
+    def _pipelining_allowed(self):
+        """
+        Commands are only pipelined while the pager is disabled, the keystroke
+        answering a page would otherwise be read as input by the commands
+        already waiting in the device input buffer
+        """
+        return self._connection._terminal.pager_disabled
+
+    def _use_load_file(self, candidate):
+        threshold = self.get_option('huawei_s_file_load_threshold')
+        lines = to_list(candidate)
+        return bool(threshold) and len(lines) >= threshold and not any(isinstance(line, Mapping) for line in lines)
+
+    def _load_file(self, lines):
+        """
+        Load configuration lines by transferring them to the device flash as a
+        batch file and executing it in one operation
+        :param lines: List of configuration lines
+        :return: Output of the batch file execution
+        """
+        fd, path = tempfile.mkstemp(suffix='.bat')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            self.copy_file(source=path, destination=LOAD_FILE, proto=self.get_option('huawei_s_file_transfer_proto'))
+        except AnsibleConnectionFailure:
+            raise
+        except Exception as exc:
+            # paramiko, scp and missing library errors must reach the cleanup
+            # of edit_config like any other connection failure
+            raise AnsibleConnectionFailure('unable to transfer %s to the device: %s' % (LOAD_FILE, to_text(exc)))
+        finally:
+            os.remove(path)
+
+        # the device prints a prompt before the echo of every line of the
+        # batch file, the prompt matching of connection.send would end the
+        # read at the first one, so read until every line has been echoed
+        # and the output settles on the final prompt
+        execute = 'execute %s' % LOAD_FILE
+        self._connection.send(to_bytes(execute), sendonly=True)
+        data = self._receive_raw(execute, len(lines))[0]
+        self._connection._matched_prompt = PROMPT_END_RE.search(data).group().strip()
+        out = self._sanitize(self._connection._strip(data))
+        if not self.response_logging:
+            self.history.append(('*****', '*****'))
         else:
-            return 'full'
+            self.history.append((to_bytes(execute), out))
+
+        # the response holds the output of every line of the batch file, an
+        # error followed by enough output of the later lines falls outside
+        # the tail the terminal error regexes look at, so scan each line
+        failures = []
+        index = -1
+        command = None
+        for line in out.splitlines():
+            match = PROMPT_LINE_RE.match(line)
+            if match and match.group(1).strip():
+                index += 1
+                command = match.group(1).strip()
+            elif any(regex.search(to_bytes(line, errors='surrogate_or_strict')) for regex in TerminalModule.terminal_stderr_re):
+                if command is None:
+                    failures.append("'execute %s' failed: %s" % (LOAD_FILE, line.strip()))
+                else:
+                    failures.append("line %d of the candidate configuration '%s' failed: %s" % (index + 1, command, line.strip()))
+        if failures:
+            raise AnsibleConnectionFailure('\n'.join(failures))
+        return out
+
+    def _delete_load_file(self):
+        # delete is a user-view command, the batch file holds configuration
+        # secrets and must not be left on the flash
+        try:
+            if self._get_prompt().startswith('['):
+                self.send_command('return')
+            self.send_command('delete /unreserved %s' % LOAD_FILE, prompt=r'[\(\[]y/n[\)\]]', answer='y')
+        except AnsibleConnectionFailure as exc:
+            self._connection.queue_message('warning', 'unable to delete %s from the device: %s' % (LOAD_FILE, to_text(exc)))
+
+    def _discard_candidate(self):
+        try:
+            self.send_command('clear configuration candidate')
+            self.send_command('return')
+        except AnsibleConnectionFailure:
+            pass
+
+    def _edit_window(self, window, offset=0):
+        """
+        Load a window of configuration lines into the device
+        :param window: List of configuration lines
+        :param offset: Position of the first line of the window in the candidate
+        :return: List of responses, one per line
+        """
+        if not window:
+            return []
+        if len(window) == 1:
+            return [self.send_command(window[0])]
+
+        responses = []
+        for index, (out, error) in enumerate(self._send_pipelined(window)):
+            if error:
+                msg = "line %d of the candidate configuration '%s' failed: %s" % (offset + index + 1, window[index], out)
+                if index + 1 < len(window):
+                    # the device read the rest of the window along with the
+                    # failing line, say which lines it may have applied
+                    msg += '\nlines %d to %d of the candidate configuration were sent after it: %s' % (
+                        offset + index + 2, offset + len(window), ', '.join("'%s'" % line for line in window[index + 1:]))
+                raise AnsibleConnectionFailure(msg)
+            responses.append(out)
+        return responses
+
+    def _send_pipelined(self, commands):
+        """
+        Write a window of commands to the device in a single channel write and
+        wait for the prompt once, after the device has read the last command.
+        The combined output is split back into per command responses using the
+        prompt that precedes the echo of every command as delimiter.
+        :param commands: List of commands to send
+        :return: List of (response, error) tuples, one per command, where error
+                 is True if the response matched one of the terminal error regexes
+        """
+        # the window goes through connection.send like any other command to
+        # keep the prompt context, history and log of the connection
+        self._connection.send(to_bytes('\r'.join(commands), errors='surrogate_or_strict'), sendonly=True)
+
+        blocks = []
+
+        def split(data):
+            blocks[:] = self._split_pipelined(data, commands)
+            return len(blocks) == len(commands)
+
+        data, complete = self._receive_raw(commands[-1], len(commands) - 1, split)
+        if not complete:
+            # an echo the device altered, beyond the wrapping handled by
+            # _echo_re, never matches, fail instead of waiting for the timeout
+            raise AnsibleConnectionFailure("unable to find the echo of command '%s' in the response of the device"
+                                           % commands[min(len(blocks) + 1, len(commands) - 1)])
+        self._connection._matched_prompt = PROMPT_END_RE.search(data).group().strip()
+
+        results = []
+        for cmd, block in zip(commands, blocks):
+            b_out = to_bytes(block, errors='surrogate_or_strict')
+            error = any(regex.search(b_out) for regex in TerminalModule.terminal_stderr_re)
+            if not self.response_logging:
+                self.history.append(('*****', '*****'))
+            else:
+                self.history.append((to_bytes(cmd), block))
+            results.append((block, error))
+        return results
+
+    def _receive_raw(self, command, count, ready=None):
+        """
+        Read the output of commands written with connection.send(sendonly=True)
+        until at least count prompts started a line and the output ends with a
+        prompt. The read then ends as soon as ready(data) is true, or once no
+        more data arrives for persistent_buffer_read_timeout seconds.
+        :param command: Last command written, for the error messages
+        :param count: Number of prompts expected before the final one
+        :param ready: Callable telling from the raw output if it is complete
+        :return: Tuple of the raw output and whether ready was true for it
+        """
+        connection = self._connection
+        shell = connection._ssh_shell
+        timeout = shell.gettimeout()
+        settle = connection.get_option('persistent_buffer_read_timeout')
+
+        recv = bytearray()
+        prompts = 0
+        scanned = 0
+        settling = False
+        try:
+            while True:
+                try:
+                    data = shell.recv(4096)
+                except socket.timeout:
+                    if not settling:
+                        raise
+                    return bytes(recv), False
+                if settling:
+                    shell.settimeout(timeout)
+                    settling = False
+                if not data:
+                    raise AnsibleConnectionFailure('connection closed while waiting for response to command: %s' % command)
+                connection._log_messages('response: %s' % data)
+                recv.extend(data)
+
+                # count the prompts preceding the echo of the next command on
+                # the lines completed by this read
+                end = recv.rfind(b'\n') + 1
+                if end > scanned:
+                    prompts += len(PROMPT_ECHO_RE.findall(recv, scanned, end))
+                    scanned = end
+
+                tail = bytes(recv[-256:])
+                # only a single command, like the batch file execution, can
+                # be paged here, see _pipelining_allowed
+                if TerminalModule.terminal_pager_re.search(tail):
+                    shell.sendall(TerminalModule.terminal_pager_answer)
+                    connection._log_messages('send pager answer: %s' % TerminalModule.terminal_pager_answer)
+                elif prompts >= count and PROMPT_END_RE.search(tail):
+                    if ready is not None and ready(bytes(recv)):
+                        return bytes(recv), True
+                    shell.settimeout(settle)
+                    settling = True
+        except socket.timeout:
+            raise AnsibleConnectionFailure("timeout value %s seconds reached while trying to send command: %s"
+                                           % (timeout, command))
+        finally:
+            if settling:
+                shell.settimeout(timeout)
+
+    def _split_pipelined(self, data, commands):
+        """
+        Split the output of pipelined commands into one response per command. A
+        response follows the echo of its command and ends at the prompt that
+        precedes the echo of the next command, or at the final prompt.
+        :param data: Raw output received from the device
+        :param commands: List of commands that produced the output
+        :return: List of responses for the commands that have completed
+        """
+        text = self._sanitize(self._connection._strip(data))
+        # the output starts with the echo of the first command
+        echo = self._echo_re(commands[0]).match(text, len(text) - len(text.lstrip()))
+        start = echo.end() if echo else text.find('\n') + 1
+        blocks = []
+        for match in PROMPT_START_RE.finditer(text):
+            if len(blocks) + 1 < len(commands):
+                echo = self._echo_re(commands[len(blocks) + 1]).match(text, match.end())
+                if not echo:
+                    continue
+            elif text[match.end():].strip():
+                continue
+            blocks.append(text[start:match.start()].strip())
+            if len(blocks) == len(commands):
+                break
+            start = echo.end()
+        return blocks
+
+    @staticmethod
+    def _echo_re(command):
+        """
+        The device echoes a command longer than the terminal width wrapped
+        over several lines, allow a line break between any two characters
+        """
+        return re.compile(r'[ \t]*' + r'\r*\n?'.join(re.escape(char) for char in command.strip()) + r'[ \t]*\r?$', re.M)
 
     def _extract_banners(self, config):
         banners = {}
@@ -0,0 +1,187 @@
+#
+# (c) 2016 Red Hat Inc.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import signal
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.plugins.connection import network_cli
+from ansible.plugins.connection.network_cli import AnsibleCmdRespRecv
+from ansible.plugins.connection.network_cli import Connection as NetworkCliConnection
+
+DOCUMENTATION = """
+---
+author: Aleksandr Natov (@pahedu)
+connection: huawei_s
+short_description: network_cli connection tuned for Huawei S series switches
+description:
+  - This connection plugin is the network_cli connection with a receive loop
+    suited to the multi-megabyte outputs of Huawei S series switches.  The
+    response is accumulated in a single buffer read in large chunks and the
+    device prompt is only searched for in the last few hundred bytes, so the
+    cost of reading a response grows linearly with its size.
+  - Use it in place of network_cli with C(ansible_network_os=huawei_s).
+version_added: "2.9"
+"""
+
+# the options are the ones of network_cli, Ansible reads them from the
+# DOCUMENTATION attribute of the loaded module, so they are taken from the
+# installed network_cli instead of a copy that would drift from it
+DOCUMENTATION += network_cli.DOCUMENTATION[network_cli.DOCUMENTATION.index('\noptions:') + 1:]
+
+#: Number of bytes asked from the channel at once
+RECV_SIZE = 65536
+
+#: Number of bytes at the end of the response searched for the device prompt
+PROMPT_WINDOW = 256
+
+
+class Connection(NetworkCliConnection):
+    ''' network_cli connection with a linear time receive loop '''
+
+    transport = 'huawei_s'
+
+    def receive(self, command=None, prompts=None, answer=None, newline=True, prompt_retry_check=False, check_all=False):
+        '''
+        Handles receiving of output from command
+        '''
+        self._matched_prompt = None
+        self._matched_cmd_prompt = None
+        recv = bytearray()
+        handled = False
+        command_prompt_matched = False
+        matched_prompt_window = window_count = 0
+
+        # set terminal regex values for command prompt and errors in response
+        self._terminal_stderr_re = self._get_terminal_std_re('terminal_stderr_re')
+        self._terminal_stdout_re = self._get_terminal_std_re('terminal_stdout_re')
+
+        cache_socket_timeout = self._ssh_shell.gettimeout()
+        command_timeout = self.get_option('persistent_command_timeout')
+        self._validate_timeout_value(command_timeout, "persistent_command_timeout")
+        if cache_socket_timeout != command_timeout:
+            self._ssh_shell.settimeout(command_timeout)
+
+        buffer_read_timeout = self.get_option('persistent_buffer_read_timeout')
+        self._validate_timeout_value(buffer_read_timeout, "persistent_buffer_read_timeout")
+
+        self._log_messages("command: %s" % command)
+        while True:
+            if command_prompt_matched:
+                try:
+                    signal.signal(signal.SIGALRM, self._handle_buffer_read_timeout)
+                    signal.setitimer(signal.ITIMER_REAL, buffer_read_timeout)
+                    data = self._ssh_shell.recv(RECV_SIZE)
+                    signal.alarm(0)
+                    self._log_messages("response-%s: %s" % (window_count + 1, data))
+                    # if data is still received on channel it indicates the prompt string
+                    # is wrongly matched in between response chunks, continue to read
+                    # remaining response.
+                    command_prompt_matched = False
+
+                    # restart command_timeout timer
+                    signal.signal(signal.SIGALRM, self._handle_command_timeout)
+                    signal.alarm(command_timeout)
+
+                except AnsibleCmdRespRecv:
+                    # reset socket timeout to global timeout
+                    self._ssh_shell.settimeout(cache_socket_timeout)
+                    return self._command_response
+            else:
+                data = self._ssh_shell.recv(RECV_SIZE)
+                self._log_messages("response-%s: %s" % (window_count + 1, data))
+            # when a channel stream is closed, received data will be empty
+            if not data:
+                break
+
+            recv.extend(data)
+            if self._terminal.terminal_pager_re.search(recv[-PROMPT_WINDOW:]):
+                # screen-length could not be disabled, ask for the next page
+                self._ssh_shell.sendall(self._terminal.terminal_pager_answer)
+                continue
+
+            # the new data and enough of what came before it for a prompt or
+            # an error message split between two reads
+            offset = max(0, len(recv) - len(data) - PROMPT_WINDOW)
+
+            window = self._strip(bytes(recv[offset:]))
+            self._last_recv_window = window
+            window_count += 1
+
+            if prompts and not handled:
+                handled = self._handle_prompt(window, prompts, answer, newline, False, check_all)
+                matched_prompt_window = window_count
+            elif prompts and handled and prompt_retry_check and matched_prompt_window + 1 == window_count:
+                # check again even when handled, if same prompt repeats in next window
+                # (like in the case of a wrong enable password, etc) indicates
+                # value of answer is wrong, report this as error.
+                if self._handle_prompt(window, prompts, answer, newline, prompt_retry_check, check_all):
+                    raise AnsibleConnectionFailure("For matched prompt '%s', answer is not valid" % self._matched_cmd_prompt)
+
+            if self._find_prompt(window):
+                self._last_response = bytes(recv)
+                resp = self._strip(self._last_response)
+                self._command_response = self._sanitize(resp, command)
+                if buffer_read_timeout == 0.0:
+                    # reset socket timeout to global timeout
+                    self._ssh_shell.settimeout(cache_socket_timeout)
+                    return self._command_response
+                else:
+                    command_prompt_matched = True
+
+    def _find_prompt(self, response):
+        '''
+        Searches the received window for an error message and its end for
+        a matching command prompt, the prompt regexes are anchored to the
+        end of the response and do not need to see more of it
+        '''
+        errored_response = None
+        is_error_message = False
+        prompt_window = response[-PROMPT_WINDOW:]
+
+        for regex in self._terminal_stderr_re:
+            if regex.search(response):
+                is_error_message = True
+
+                # Check if error response ends with command prompt if not
+                # receive it buffered prompt
+                for regex in self._terminal_stdout_re:
+                    match = regex.search(prompt_window)
+                    if match:
+                        errored_response = response
+                        self._matched_pattern = regex.pattern
+                        self._matched_prompt = match.group()
+                        self._log_messages("matched error regex '%s' from response '%s'" % (self._matched_pattern, errored_response))
+                        break
+
+        if not is_error_message:
+            for regex in self._terminal_stdout_re:
+                match = regex.search(prompt_window)
+                if match:
+                    self._matched_pattern = regex.pattern
+                    self._matched_prompt = match.group()
+                    self._log_messages("matched cli prompt '%s' with regex '%s' from response '%s'"
+                                       % (self._matched_prompt, self._matched_pattern, prompt_window))
+                    return True
+
+        if errored_response:
+            raise AnsibleConnectionFailure(errored_response)
+
+        return False
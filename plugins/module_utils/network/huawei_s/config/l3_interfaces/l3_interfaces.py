@@ -15,6 +15,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import get_interface_type, dict_to_set
 from ansible.module_utils.network.huawei_s.utils.utils import remove_command_from_config_list, add_command_to_config_list
 from ansible.module_utils.network.huawei_s.utils.utils import filter_dict_having_none_value, remove_duplicate_interface
@@ -35,6 +36,10 @@ class L3_Interfaces(ConfigBase):
         'l3_interfaces'
     ]
 
+    def __init__(self, module):
+        super(L3_Interfaces, self).__init__(module)
+        self._connection = get_resource_connection(module)
+
     def get_l3_interfaces_facts(self):
         """ Get the 'facts' (the current configuration)
         :rtype: A dictionary
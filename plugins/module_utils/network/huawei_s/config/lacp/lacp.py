@@ -18,6 +18,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import get_interface_type, dict_to_set
 
 
@@ -37,6 +38,7 @@ class Lacp(ConfigBase):
 
     def __init__(self, module):
         super(Lacp, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_lacp_facts(self):
         """ Get the 'facts' (the current configuration)
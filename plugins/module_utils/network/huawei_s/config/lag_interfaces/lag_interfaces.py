@@ -20,6 +20,7 @@ from ansible.module_utils.network.common import utils
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import dict_to_set
 
 
@@ -39,6 +40,7 @@ class Lag_interfaces(ConfigBase):
 
     def __init__(self, module):
         super(Lag_interfaces, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_lag_interfaces_facts(self):
         """ Get the 'facts' (the current configuration)
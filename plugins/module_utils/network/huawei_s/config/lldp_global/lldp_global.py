@@ -16,6 +16,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import dict_to_set
 from ansible.module_utils.network.huawei_s.utils.utils import filter_dict_having_none_value
 
@@ -36,6 +37,7 @@ class Lldp_global(ConfigBase):
 
     def __init__(self, module):
         super(Lldp_global, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_lldp_global_facts(self):
         """ Get the 'facts' (the current configuration)
@@ -18,6 +18,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import dict_to_set
 from ansible.module_utils.network.huawei_s.utils.utils import remove_command_from_config_list, add_command_to_config_list
 
@@ -38,6 +39,7 @@ class Lldp_Interfaces(ConfigBase):
 
     def __init__(self, module):
         super(Lldp_Interfaces, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_lldp_interfaces_facts(self):
         """ Get the 'facts' (the current configuration)
@@ -18,6 +18,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s.facts.facts import Facts
+from ansible.module_utils.network.huawei_s.huawei_s import get_resource_connection
 from ansible.module_utils.network.huawei_s.utils.utils import dict_to_set
 
 
@@ -37,6 +38,7 @@ class Vlans(ConfigBase):
 
     def __init__(self, module):
         super(Vlans, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_interfaces_facts(self):
         """ Get the 'facts' (the current configuration)
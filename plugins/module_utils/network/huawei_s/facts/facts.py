@@ -13,7 +13,10 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+from ansible.module_utils.six import iteritems
 from ansible.module_utils.network.common.facts.facts import FactsBase
+from ansible.module_utils.network.huawei_s.huawei_s import decode_output, get_capabilities, get_resource_connection
+from ansible.module_utils.network.huawei_s.utils.config import ConfigIndex
 from ansible.module_utils.network.huawei_s.facts.interfaces.interfaces import InterfacesFacts
 from ansible.module_utils.network.huawei_s.facts.l2_interfaces.l2_interfaces import L2_InterfacesFacts
 from ansible.module_utils.network.huawei_s.facts.vlans.vlans import VlansFacts
@@ -33,6 +36,8 @@ FACT_LEGACY_SUBSETS = dict(
     config=Config
 )
 
+CONFIG_COMMAND = 'display current-configuration'
+
 FACT_RESOURCE_SUBSETS = dict(
     interfaces=InterfacesFacts,
     l2_interfaces=L2_InterfacesFacts,
@@ -55,6 +60,7 @@ class Facts(FactsBase):
 
     def __init__(self, module):
         super(Facts, self).__init__(module)
+        self._connection = get_resource_connection(module)
 
     def get_facts(self, legacy_facts_type=None, resource_facts_type=None, data=None):
         """ Collect the facts for huawei_s
@@ -64,10 +70,128 @@ class Facts(FactsBase):
         :rtype: dict
         :return: the facts gathered
         """
+        resource_instances = list()
         if self.VALID_RESOURCE_SUBSETS:
-            self.get_network_resources_facts(FACT_RESOURCE_SUBSETS, resource_facts_type, data)
+            resource_instances = self.get_network_resources_instances(FACT_RESOURCE_SUBSETS, resource_facts_type)
 
+        legacy_instances = list()
         if self.VALID_LEGACY_GATHER_SUBSETS:
-            self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
+            legacy_instances = self.get_network_legacy_instances(FACT_LEGACY_SUBSETS, legacy_facts_type)
+
+        if data is None and get_capabilities(self._module).get('facts_source') == 'config':
+            config_derived = [inst for inst in resource_instances if hasattr(inst, 'populate_facts_from_config')]
+        else:
+            config_derived = []
+
+        outputs = self.run_planned_commands(resource_instances if data is None else [], legacy_instances, config_derived)
+
+        # large outputs are decompressed one subset at a time
+        index = None
+        for inst in resource_instances:
+            if data is not None:
+                inst.populate_facts(self._connection, self.ansible_facts, data)
+            elif inst in config_derived:
+                if index is None:
+                    index = ConfigIndex(decode_output(outputs[CONFIG_COMMAND]))
+                command = getattr(inst, 'OPERATIONAL_COMMAND', None)
+                output = decode_output(outputs[command]) if command else None
+                inst.populate_facts_from_config(self._connection, self.ansible_facts, index, output)
+            else:
+                inst.populate_facts(self._connection, self.ansible_facts, decode_output(outputs[inst.COMMAND]))
+
+        if legacy_instances:
+            facts = dict()
+            for inst in legacy_instances:
+                inst.responses = [decode_output(outputs[command]) for command in inst.COMMANDS]
+                inst.populate()
+                facts.update(inst.facts)
+                self._warnings.extend(inst.warnings)
+
+            for key, value in iteritems(facts):
+                key = 'ansible_net_%s' % key
+                self.ansible_facts[key] = value
 
         return self.ansible_facts, self._warnings
+
+    def get_network_resources_instances(self, facts_resource_obj_map, resource_facts_type=None):
+        """ Instantiate the fact classes of the requested resources
+        :param facts_resource_obj_map: Map of resource names to fact classes
+        :param resource_facts_type: List of resource fact types
+        :rtype: list
+        :return: the fact class instances
+        """
+        if not resource_facts_type:
+            resource_facts_type = self._gather_network_resources
+
+        instances = list()
+        restorun_subsets = self.gen_runable(resource_facts_type, frozenset(facts_resource_obj_map.keys()), resource_facts=True)
+        if restorun_subsets:
+            self.ansible_facts['ansible_net_gather_network_resources'] = list(restorun_subsets)
+            for key in restorun_subsets:
+                fact_cls_obj = facts_resource_obj_map.get(key)
+                if fact_cls_obj:
+                    instances.append(fact_cls_obj(self._module))
+                else:
+                    self._warnings.extend(["network resource fact gathering for '%s' is not supported" % key])
+        return instances
+
+    def get_network_legacy_instances(self, fact_legacy_obj_map, legacy_facts_type=None):
+        """ Instantiate the fact classes of the requested legacy subsets
+        :param fact_legacy_obj_map: Map of subset names to fact classes
+        :param legacy_facts_type: List of legacy facts types
+        :rtype: list
+        :return: the fact class instances
+        """
+        if not legacy_facts_type:
+            legacy_facts_type = self._gather_subset
+
+        instances = list()
+        runable_subsets = self.gen_runable(legacy_facts_type, frozenset(fact_legacy_obj_map.keys()))
+        if runable_subsets:
+            # default subset should always returned be with legacy facts subsets
+            if 'default' not in runable_subsets:
+                runable_subsets.add('default')
+            self.ansible_facts['ansible_net_gather_subset'] = list(runable_subsets)
+
+            for key in runable_subsets:
+                instances.append(fact_legacy_obj_map[key](self._module))
+        return instances
+
+    def run_planned_commands(self, resource_instances, legacy_instances, config_derived=None):
+        """ Run every command needed by the fact classes once, in one batch
+        :param resource_instances: Resource fact class instances
+        :param legacy_instances: Legacy fact class instances
+        :param config_derived: Resource instances rendered from the running configuration
+        :rtype: dict
+        :return: the output of every command, possibly compressed
+        """
+        legacy_commands = list()
+        for inst in legacy_instances:
+            for command in inst.COMMANDS:
+                if command not in legacy_commands:
+                    legacy_commands.append(command)
+
+        # errors are part of the output the legacy parsers expect, so a
+        # command shared with a legacy subset is run without checking them
+        resource_commands = list()
+        for inst in resource_instances:
+            if config_derived and inst in config_derived:
+                commands = [CONFIG_COMMAND, getattr(inst, 'OPERATIONAL_COMMAND', None)]
+            else:
+                commands = [inst.COMMAND]
+            for command in commands:
+                if command and command not in legacy_commands and command not in resource_commands:
+                    resource_commands.append(command)
+
+        requests = list()
+        for commands, check_rc in ((resource_commands, True), (legacy_commands, False)):
+            if commands:
+                requests.append({'method': 'run_commands', 'args': {'commands': commands, 'check_rc': check_rc}})
+        if not requests:
+            return dict()
+
+        outputs = dict()
+        responses = self._connection.run_batch(requests=requests, compress=True)
+        for request, response in zip(requests, responses):
+            outputs.update(zip(request['args']['commands'], response))
+        return outputs
@@ -17,14 +17,26 @@ __metaclass__ = type
 from copy import deepcopy
 import re
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s.utils.utils import FieldExtractor, get_interface_type, normalize_interface
 from ansible.module_utils.network.huawei_s.argspec.interfaces.interfaces import InterfacesArgs
 
 
+INTERFACE_FIELDS = FieldExtractor((
+    ('description', r'Description\s*:\s*(.*)\nS'),
+    ('speed', r'Speed\s*:\s*(\d+)'),
+    ('mtu', r'The\s+Maximum\s+Frame\s+Length\s+is\s+(\d+)'),
+    ('duplex', r'Duplex\s*:\s*(FULL|HALF)'),
+    ('negotiation', r'Negotiation\s*:\s*(DISABLE|ENABLE)'),
+    ('state', r'\S+\s+current\s+state\s*:\s*(DOWN|UP|Administratively DOWN)'),
+))
+
+
 class InterfacesFacts(object):
     """ The huawei_s interfaces fact class
     """
 
+    COMMAND = 'display interface'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = InterfacesArgs.argument_spec
@@ -49,8 +61,8 @@ class InterfacesFacts(object):
         """
         objs = []
 
-        if not data:
-            data = connection.get('display interface')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = data.split('\n\n')
         for conf in config:
@@ -97,35 +109,16 @@ class InterfacesFacts(object):
         # populate the facts from the configuration
         config['name'] = normalize_interface(intf)
 
-        match = re.search(r'Description\s*:\s*(.*)\nS', conf)
-        if match:
-            config['description'] = match.group(1)
-        #config['description'] = utils.parse_conf_arg(conf, 'description')
-        match = re.search(r'Speed\s*:\s*(\d+)', conf)
-        if match:
-            config['speed'] = match.group(1)
-        #config['speed'] = utils.parse_conf_arg(conf, 'speed')
-        match = re.search(r'The\s+Maximum\s+Frame\s+Length\s+is\s+(\d+)', conf)
-        if match:
-            config['mtu'] = match.group(1)
-        #if utils.parse_conf_arg(conf, 'jumboframe enable'):
-        #    config['mtu'] = int(utils.parse_conf_arg(conf, 'jumboframe enable'))
-        match = re.search(r'Duplex\s*:\s*(FULL|HALF)', conf)
-        if match:
-            config['duplex'] = match.group(1).lower()
-        #config['duplex'] = utils.parse_conf_arg(conf, 'duplex')
-        match = re.search(r'Negotiation\s*:\s*(DISABLE|ENABLE)', conf)
-        if match:
-            if match.group(1).lower() == 'enable':
-                config['negotiation'] = True
-            else:
-                config['negotiation'] = False
-        match = re.search(r'\S+\s+current\s+state\s*:\s*(DOWN|UP|Administratively DOWN)', conf)
-        if match:
-            if match.group(1) == 'Administratively DOWN':
-                config['enabled'] = False
-            else:
-                config['enabled'] = True
+        fields = INTERFACE_FIELDS.extract(conf)
+        config['description'] = fields['description']
+        config['speed'] = fields['speed']
+        config['mtu'] = fields['mtu']
+        if fields['duplex']:
+            config['duplex'] = fields['duplex'].lower()
+        if fields['negotiation']:
+            config['negotiation'] = fields['negotiation'] == 'ENABLE'
+        if fields['state']:
+            config['enabled'] = fields['state'] != 'Administratively DOWN'
         #enabled = utils.parse_conf_cmd_arg(conf, 'shutdown', False)
         #config['enabled'] = enabled if enabled is not None else True
 
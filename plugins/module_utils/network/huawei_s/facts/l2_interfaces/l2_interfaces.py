@@ -24,6 +24,8 @@ class L2_InterfacesFacts(object):
     """ The huawei_s l2 interfaces fact class
     """
 
+    COMMAND = 'display port vlan'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = L2_InterfacesArgs.argument_spec
@@ -48,8 +50,8 @@ class L2_InterfacesFacts(object):
         """
         objs = []
 
-        if not data:
-            data = connection.get('display port vlan')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = data.split('\n')
 
@@ -15,8 +15,8 @@ __metaclass__ = type
 
 
 from copy import deepcopy
-import re
 from ansible.module_utils.network.common import utils
+from ansible.module_utils.network.huawei_s.utils.config import ConfigIndex
 from ansible.module_utils.network.huawei_s.utils.utils import get_interface_type, normalize_interface
 from ansible.module_utils.network.huawei_s.argspec.l3_interfaces.l3_interfaces import L3_InterfacesArgs
 
@@ -25,6 +25,8 @@ class L3_InterfacesFacts(object):
     """ The huawei_s l3 interfaces fact class
     """
 
+    COMMAND = 'display current-configuration interface'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = L3_InterfacesArgs.argument_spec
@@ -47,17 +49,25 @@ class L3_InterfacesFacts(object):
         :rtype: dictionary
         :returns: facts
         """
+        if data is None:
+            data = connection.get(self.COMMAND)
+        return self.populate_facts_from_config(connection, ansible_facts, ConfigIndex(data))
+
+    def populate_facts_from_config(self, connection, ansible_facts, index, data=None):
+        """ Populate the facts for l3 interfaces from the running configuration
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param index: the running configuration index
+        :param data: output of the operational command
+        :rtype: dictionary
+        :returns: facts
+        """
         objs = []
 
-        if not data:
-            data = connection.get('display current-configuration interface')
-        # operate on a collection of resource x
-        config = re.split('interface ', data)
-        for conf in config:
-            if conf:
-                obj = self.render_config(self.generated_spec, conf)
-                if obj:
-                    objs.append(obj)
+        for name in index.get_views('interface'):
+            obj = self.render_config(self.generated_spec, name, index)
+            if obj:
+                objs.append(obj)
         facts = {}
 
         if objs:
@@ -69,17 +79,17 @@ class L3_InterfacesFacts(object):
 
         return ansible_facts
 
-    def render_config(self, spec, conf):
+    def render_config(self, spec, intf, index):
         """
         Render config as dictionary structure and delete keys from spec for null values
         :param spec: The facts tree, generated from the argspec
-        :param conf: The configuration
+        :param intf: The interface name
+        :param index: The configuration index
         :rtype: dictionary
         :returns: The generated config
         """
         config = deepcopy(spec)
-        match = re.search(r'^(\S+)', conf)
-        intf = match.group(1)
+        view = 'interface %s' % intf
 
         if get_interface_type(intf) == 'unknown':
             return {}
@@ -87,7 +97,7 @@ class L3_InterfacesFacts(object):
         config['name'] = normalize_interface(intf)
 
         ipv4 = []
-        ipv4_all = re.findall(r"ip [Aa]ddress (\S+.*)", conf)
+        ipv4_all = [line[len('ip address '):] for line in index.get_lines('ip address ', view)]
         for each in ipv4_all:
             each_ipv4 = dict()
             if 'sub' not in each and 'dhcp' not in each:
@@ -102,7 +112,7 @@ class L3_InterfacesFacts(object):
 
         # Get the configured IPV6 details
         ipv6 = []
-        ipv6_all = re.findall(r"ipv6 address (\S+)", conf)
+        ipv6_all = [line.split()[2] for line in index.get_lines('ipv6 address ', view)]
         for each in ipv6_all:
             each_ipv6 = dict()
             if 'auto' in each:
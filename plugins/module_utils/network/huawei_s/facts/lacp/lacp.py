@@ -24,6 +24,8 @@ class LacpFacts(object):
     """ The huawei_s lacp fact class
     """
 
+    COMMAND = 'display lacp brief'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = LacpArgs.argument_spec
@@ -49,8 +51,8 @@ class LacpFacts(object):
         if connection:
             pass
 
-        if not data:
-            data = connection.get('display lacp brief')
+        if data is None:
+            data = connection.get(self.COMMAND)
 
         obj = {}
         if data:
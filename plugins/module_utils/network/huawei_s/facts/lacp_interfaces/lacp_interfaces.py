@@ -25,6 +25,8 @@ class Lacp_InterfacesFacts(object):
     """ The huawei_s_lacp_interfaces fact class
     """
 
+    COMMAND = 'display eth-trunk'
+
     def __init__(self, module, subspec='config', options='options'):
 
         self._module = module
@@ -52,8 +54,8 @@ class Lacp_InterfacesFacts(object):
             pass
 
         objs = []
-        if not data:
-            data = connection.get('display eth-trunk')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = re.split(r'\n\s*\n', data)
 
@@ -73,6 +75,55 @@ class Lacp_InterfacesFacts(object):
 
         return ansible_facts
 
+    def populate_facts_from_config(self, connection, ansible_facts, index, data=None):
+        """ Populate the facts for lacp_interfaces from the running configuration
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param index: the running configuration index
+        :param data: output of the operational command
+        :rtype: dictionary
+        :returns: facts
+        """
+        # display eth-trunk reports the system priority of every trunk
+        system_priority = int(index.get_value('lacp priority ') or 32768)
+
+        objs = []
+        for name, lines in index.get_views('interface').items():
+            if get_interface_type(name) == 'Eth-Trunk' and '.' not in name:
+                objs.append(self.render_view(self.generated_spec, name, lines, system_priority))
+
+        facts = {}
+
+        if objs:
+            facts['lacp_interfaces'] = []
+            params = utils.validate_config(self.argument_spec, {'config': objs})
+            for cfg in params['config']:
+                facts['lacp_interfaces'].append(utils.remove_empties(cfg))
+        ansible_facts['ansible_network_resources'].update(facts)
+
+        return ansible_facts
+
+    def render_view(self, spec, name, lines, system_priority):
+        """
+        Render the view of an Eth-Trunk as dictionary structure
+
+        :param spec: The facts tree, generated from the argspec
+        :param name: The Eth-Trunk name
+        :param lines: The lines of the Eth-Trunk view
+        :param system_priority: The LACP system priority
+        :rtype: dictionary
+        :returns: The generated config
+        """
+        config = deepcopy(spec)
+        config['name'] = normalize_interface(name)
+
+        config['port_priority'] = system_priority
+        for line in lines:
+            if line.startswith('max active-linknumber '):
+                config['max_bundle'] = int(line.split()[-1])
+
+        return utils.remove_empties(config)
+
     def render_config(self, spec, conf):
         """
         Render config as dictionary structure and delete keys
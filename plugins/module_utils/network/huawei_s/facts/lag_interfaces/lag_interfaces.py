@@ -26,6 +26,8 @@ class Lag_interfacesFacts(object):
     """ The huawei_s_lag_interfaces fact class
     """
 
+    COMMAND = 'display eth-trunk'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = Lag_interfacesArgs.argument_spec
@@ -50,8 +52,8 @@ class Lag_interfacesFacts(object):
         """
         objs = []
 
-        if not data:
-            data = connection.get('display eth-trunk')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = re.split(r'\n\s*\n', data)
         for conf in config:
@@ -80,6 +82,62 @@ class Lag_interfacesFacts(object):
 
         return ansible_facts
 
+    def populate_facts_from_config(self, connection, ansible_facts, index, data=None):
+        """ Populate the facts for interfaces from the running configuration
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param index: the running configuration index
+        :param data: output of the operational command
+        :rtype: dictionary
+        :returns: facts
+        """
+        # the membership is configured in the view of the member port
+        members = {}
+        for name in index.get_views('interface'):
+            trunk = index.get_value('eth-trunk ', 'interface %s' % name)
+            if trunk:
+                members.setdefault('Eth-Trunk%s' % trunk.split()[0], []).append(name)
+
+        objs = []
+        for name, lines in index.get_views('interface').items():
+            if get_interface_type(name) == 'Eth-Trunk' and '.' not in name:
+                objs.append(self.render_view(self.generated_spec, name, lines, members.get(name, [])))
+
+        facts = {}
+
+        if objs:
+            facts['lag_interfaces'] = []
+            params = utils.validate_config(self.argument_spec, {'config': objs})
+
+            for cfg in params['config']:
+                facts['lag_interfaces'].append(utils.remove_empties(cfg))
+        ansible_facts['ansible_network_resources'].update(facts)
+
+        return ansible_facts
+
+    def render_view(self, spec, name, lines, members):
+        """
+        Render the view of an Eth-Trunk as dictionary structure
+
+        :param spec: The facts tree, generated from the argspec
+        :param name: The Eth-Trunk name
+        :param lines: The lines of the Eth-Trunk view
+        :param members: The names of the member ports
+        :rtype: dictionary
+        :returns: The generated config
+        """
+        config = deepcopy(spec)
+        config['name'] = name
+        config['members'] = []
+
+        mode = 'on'
+        if any(line.startswith('mode lacp') for line in lines):
+            mode = 'active'
+        for member in members:
+            config['members'].append({'member': member, 'mode': mode})
+
+        return utils.remove_empties(config)
+
     def render_config(self, spec, conf):
         """
         Render config as dictionary structure and delete keys
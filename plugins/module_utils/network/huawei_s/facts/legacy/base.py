@@ -16,11 +16,31 @@ __metaclass__ = type
 import platform
 import re
 
-from ansible.module_utils.network.huawei_s.huawei_s import run_commands, get_capabilities
+from ansible.module_utils.network.huawei_s.huawei_s import run_commands, get_capabilities, get_config
 from ansible.module_utils.network.huawei_s.huawei_s import normalize_interface
+from ansible.module_utils.network.huawei_s.utils.utils import FieldExtractor
 from ansible.module_utils.six import iteritems
 from ansible.module_utils.six.moves import zip
 
+# first line of each interface block of display interface and display ip(v6)
+# interface, member ports listed in an Eth-Trunk block are not headers
+INTERFACE_HEADER_RE = re.compile(
+    r'^((?:Vlanif|LoopBack|NULL|Eth-Trunk|Tunnel|Nve)\d+(?:\.\d+)?'
+    r'|(?:GigabitEthernet|XGigabitEthernet|MultiGE|Ethernet|MEth|10GE|25GE|40GE|100GE)\d+(?:/\d+){0,2}(?:\.\d+)?)'
+    r'\s+current state', re.M)
+
+INTERFACE_FIELDS = FieldExtractor((
+    ('description', r'Description:(.+)$'),
+    ('macaddress', r'Hardware address is (\S+)'),
+    ('mtu', r'The Maximum Transmit Unit is (\d+)', int),
+    ('bandwidth', r'Speed : (\d+)', int),
+    ('mediatype', r'Port Mode(?<!.Port Mode):\s+(\w+\s+\w+)'),
+    ('duplex', r'Duplex(?<!.Duplex)\s*:\s*(\w+),'),
+    ('lineprotocol', r'Line protocol current state : (\S+)'),
+    ('operstatus', r'^(?:.+) current state\s*:\s*(.+)'),
+    ('type', r'^(\S+)\d+/\d+/\d+\s+current state'),
+))
+
 
 class FactsBase(object):
 
@@ -33,7 +53,9 @@ class FactsBase(object):
         self.responses = None
 
     def populate(self):
-        self.responses = run_commands(self.module, commands=self.COMMANDS, check_rc=False)
+        # the responses may have been fetched along with other subsets
+        if self.responses is None:
+            self.responses = run_commands(self.module, commands=self.COMMANDS, check_rc=False)
 
     def run(self, cmd):
         return run_commands(self.module, commands=cmd, check_rc=False)
@@ -140,7 +162,9 @@ class Config(FactsBase):
     COMMANDS = ['display current-configuration']
 
     def populate(self):
-        super(Config, self).populate()
+        # served from the running configuration kept by the connection
+        if self.responses is None:
+            self.responses = [get_config(self.module)]
         data = self.responses[0]
         if data:
             data = re.sub(
@@ -181,38 +205,32 @@ class Interfaces(FactsBase):
             data = self.parse_interfaces(data)
             self.populate_ipv6_interfaces(data)
 
+        # fetch the lldp and cdp neighbors in a single run so they can share
+        # one pipelined round trip
+        commands = list()
         data = self.responses[3]
         lldp_errs = ['Invalid input', 'Info: Global LLDP is not enabled.']
 
         if data and not any(err in data for err in lldp_errs):
-            neighbors = self.run(['display lldp neighbor'])
-            if neighbors:
-                self.facts['neighbors'].update(self.parse_neighbors(neighbors[0]))
+            commands.append('display lldp neighbor')
 
         data = self.responses[4]
         cdp_errs = ['Info: Global LLDP is not enabled.']
 
         if data and not any(err in data for err in cdp_errs):
-            cdp_neighbors = self.run(['display cdp neighbor'])
-            if cdp_neighbors:
-                self.facts['neighbors'].update(self.parse_cdp_neighbors(cdp_neighbors[0]))
+            commands.append('display cdp neighbor')
+
+        if commands:
+            neighbors = dict(zip(commands, self.run(commands)))
+            if neighbors.get('display lldp neighbor'):
+                self.facts['neighbors'].update(self.parse_neighbors(neighbors['display lldp neighbor']))
+            if neighbors.get('display cdp neighbor'):
+                self.facts['neighbors'].update(self.parse_cdp_neighbors(neighbors['display cdp neighbor']))
 
     def populate_interfaces(self, interfaces):
         facts = dict()
         for key, value in iteritems(interfaces):
-            intf = dict()
-            intf['description'] = self.parse_description(value)
-            intf['macaddress'] = self.parse_macaddress(value)
-
-            intf['mtu'] = self.parse_mtu(value)
-            intf['bandwidth'] = self.parse_bandwidth(value)
-            intf['mediatype'] = self.parse_mediatype(value)
-            intf['duplex'] = self.parse_duplex(value)
-            intf['lineprotocol'] = self.parse_lineprotocol(value)
-            intf['operstatus'] = self.parse_operstatus(value)
-            intf['type'] = self.parse_type(value)
-
-            facts[key] = intf
+            facts[key] = INTERFACE_FIELDS.extract(value)
         return facts
 
     def populate_ipv4_interfaces(self, data):
@@ -285,72 +303,23 @@ class Interfaces(FactsBase):
         return facts
 
     def parse_interfaces(self, data):
+        # each block runs from its header to the next one
         parsed = dict()
-        key = ''
-        for line in data.split('\n'):
-            match = re.match(
-                r'^(Vlanif\d+|GigabitEthernet\d+/\d+/\d+|XGigabitEthernet\d+/\d+/\d+|25GE\d+/\d+/\d+|40GE\d+/\d+/\d+|100GE\d+/\d+/\d+)',
-                line)
-            if match:
-                key = match.group(1)
-                parsed[key] = line
-            elif len(line) == 0:
-                continue
-            elif key:
-                parsed[key] += '\n%s' % line
+        key = start = None
+        for match in INTERFACE_HEADER_RE.finditer(data):
+            if key:
+                parsed[key] = data[start:match.start()].rstrip()
+            key, start = match.group(1), match.start()
+        if key:
+            parsed[key] = data[start:].rstrip()
         return parsed
 
-    def parse_description(self, data):
-        match = re.search(r'Description:(.+)$', data, re.M)
-        if match:
-            return match.group(1)
-
-    def parse_macaddress(self, data):
-        match = re.search(r'Hardware address is (\S+)', data)
-        if match:
-            return match.group(1)
-
     def parse_ipv4(self, data):
         match = re.search(r'Internet Address is (\S+)', data)
         if match:
             addr, masklen = match.group(1).split('/')
             return dict(address=addr, masklen=int(masklen))
 
-    def parse_mtu(self, data):
-        match = re.search(r'The Maximum Transmit Unit is (\d+)', data)
-        if match:
-            return int(match.group(1))
-
-    def parse_bandwidth(self, data):
-        match = re.search(r'Speed : (\d+)', data)
-        if match:
-            return int(match.group(1))
-
-    def parse_duplex(self, data):
-        match = re.search(r'^Duplex\s*:\s*(\w+),', data, re.M)
-        if match:
-            return match.group(1)
-
-    def parse_mediatype(self, data):
-        match = re.search(r'^Port Mode:\s+(\w+\s+\w+)', data, re.M)
-        if match:
-            return match.group(1)
-
-    def parse_type(self, data):
-        match = re.search(r'^(\S+)\d+/\d+/\d+\s+current state', data, re.M)
-        if match:
-            return match.group(1)
-
-    def parse_lineprotocol(self, data):
-        match = re.search(r'Line protocol current state : (\S+)', data, re.M)
-        if match:
-            return match.group(1)
-
-    def parse_operstatus(self, data):
-        match = re.search(r'^(?:.+) current state\s*:\s*(.+)', data, re.M)
-        if match:
-            return match.group(1)
-
     def parse_lldp_intf(self, data):
         match = re.search(r'^(\S+)\s+has\s+\d+\s+neighbor', data, re.M)
         if match:
@@ -23,6 +23,8 @@ class Lldp_globalFacts(object):
     """ The huawei_s lldp_global fact class
     """
 
+    COMMAND = 'display lldp local'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = Lldp_globalArgs.argument_spec
@@ -46,8 +48,8 @@ class Lldp_globalFacts(object):
         :returns: facts
         """
         objs = dict()
-        if not data:
-            data = connection.get('display lldp local')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = data.split('\n')
         for conf in config:
@@ -14,9 +14,9 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
-import re
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
+from ansible.module_utils.network.huawei_s.utils.config import ConfigIndex
 from ansible.module_utils.network.huawei_s.utils.utils import get_interface_type, normalize_interface
 from ansible.module_utils.network.huawei_s.argspec.lldp_interfaces.lldp_interfaces import Lldp_InterfacesArgs
 
@@ -25,6 +25,8 @@ class Lldp_InterfacesFacts(object):
     """ The huawei_s_lldp_interfaces fact class
     """
 
+    COMMAND = 'display current-configuration interface'
+
     def __init__(self, module, subspec='config', options='options'):
 
         self._module = module
@@ -48,20 +50,25 @@ class Lldp_InterfacesFacts(object):
         :rtype: dictionary
         :returns: facts
         """
-        if connection:
-            pass
+        if data is None:
+            data = connection.get(self.COMMAND)
+        return self.populate_facts_from_config(connection, ansible_facts, ConfigIndex(data))
 
+    def populate_facts_from_config(self, connection, ansible_facts, index, data=None):
+        """ Populate the facts for lldp_interfaces from the running configuration
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param index: the running configuration index
+        :param data: output of the operational command
+        :rtype: dictionary
+        :returns: facts
+        """
         objs = []
-        if not data:
-            data = connection.get('display current-configuration interface')
-        # operate on a collection of resource x
-        config = data.split('interface ')
-
-        for conf in config:
-            if conf:
-                obj = self.render_config(self.generated_spec, conf)
-                if obj:
-                    objs.append(obj)
+
+        for name, lines in index.get_views('interface').items():
+            obj = self.render_config(self.generated_spec, name, lines)
+            if obj:
+                objs.append(obj)
         facts = {}
 
         if objs:
@@ -73,25 +80,21 @@ class Lldp_InterfacesFacts(object):
 
         return ansible_facts
 
-    def render_config(self, spec, conf):
+    def render_config(self, spec, intf, lines):
         """
         Render config as dictionary structure and delete keys
           from spec for null values
 
         :param spec: The facts tree, generated from the argspec
-        :param conf: The configuration
+        :param intf: The interface name
+        :param lines: The lines of the interface view
         :rtype: dictionary
         :returns: The generated config
         """
         config = deepcopy(spec)
         enabled = True
-        if 'GigabitEthernet' in conf or 'GE' in conf:
-            match = re.search(r'^(\S+)', conf)
-            intf = ''
-            if match:
-                intf = match.group(1)
-            match = re.search(r'(undo lldp enable)', conf)
-            if match:
+        if 'GigabitEthernet' in intf or 'GE' in intf:
+            if 'undo lldp enable' in lines:
                 enabled = False
 
             if get_interface_type(intf) == 'unknown':
@@ -16,6 +16,7 @@ __metaclass__ = type
 
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
+from ansible.module_utils.network.huawei_s.utils.utils import expand_vlan_range
 from ansible.module_utils.network.huawei_s.argspec.vlans.vlans import VlansArgs
 
 
@@ -23,6 +24,8 @@ class VlansFacts(object):
     """ The huaiwe_s vlans fact class
     """
 
+    COMMAND = 'display vlan'
+
     def __init__(self, module, subspec='config', options='options'):
         self._module = module
         self.argument_spec = VlansArgs.argument_spec
@@ -50,8 +53,8 @@ class VlansFacts(object):
 
         objs = []
         final_objs = []
-        if not data:
-            data = connection.get('display vlan')
+        if data is None:
+            data = connection.get(self.COMMAND)
         # operate on a collection of resource x
         config = data.split('\n')
         # Get individual vlan configs separately
@@ -74,6 +77,60 @@ class VlansFacts(object):
 
         return ansible_facts
 
+    def populate_facts_from_config(self, connection, ansible_facts, index, data=None):
+        """ Populate the facts for vlans from the running configuration
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param index: the running configuration index
+        :param data: output of the operational command
+        :rtype: dictionary
+        :returns: facts
+        """
+        vlan_ids = set([1])
+        for line in index.get_lines('vlan batch '):
+            vlan_ids.update(expand_vlan_range(line[len('vlan batch '):]))
+        for vlan in index.get_views('vlan'):
+            if vlan.isdigit():
+                vlan_ids.add(int(vlan))
+
+        objs = []
+        for vlan_id in sorted(vlan_ids):
+            objs.append(self.render_view(self.generated_spec, vlan_id, index))
+
+        facts = {}
+        facts['vlans'] = []
+        params = utils.validate_config(self.argument_spec, {'config': objs})
+
+        for cfg in params['config']:
+            facts['vlans'].append(utils.remove_empties(cfg))
+        ansible_facts['ansible_network_resources'].update(facts)
+
+        return ansible_facts
+
+    def render_view(self, spec, vlan_id, index):
+        """
+        Render the view of a vlan as dictionary structure
+
+        :param spec: The facts tree, generated from the argspec
+        :param vlan_id: The vlan id
+        :param index: The running configuration index
+        :rtype: dictionary
+        :returns: The generated config
+        """
+        config = deepcopy(spec)
+        view = 'vlan %d' % vlan_id
+        config['vlan_id'] = vlan_id
+        # the display vlan parser takes the first word of the Description
+        # column, which is VLAN 00XX when there is none, the vlan name is
+        # not displayed
+        description = index.get_value('description ', view)
+        config['name'] = description.split()[0] if description else 'VLAN'
+        if 'shutdown' not in (index.get_view(view) or []):
+            config['state'] = 'active'
+        config['shutdown'] = 'disabled'
+
+        return utils.remove_empties(config)
+
     def render_config(self, spec, conf, vlan_info):
         """
         Render config as dictionary structure and delete keys
@@ -30,6 +30,8 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import json
+import zlib
+import base64
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import env_fallback
@@ -38,6 +40,9 @@ from ansible.module_utils.connection import Connection, ConnectionError
 
 _DEVICE_CONFIGS = {}
 
+# commands that do not change the device
+READ_ONLY_COMMANDS = ('display', 'dir', 'ping', 'tracert')
+
 huawei_s_provider_spec = {
     'host': dict(),
     'port': dict(type='int'),
@@ -84,6 +89,24 @@ def get_connection(module):
     return module._huawei_s_connection
 
 
+def get_resource_connection(module):
+    """Return the connection shared by the resource modules and their facts,
+    it keeps the output of display commands for the module execution
+    """
+    if isinstance(getattr(module, '_connection', None), CachedConnection):
+        return module._connection
+
+    capabilities = get_capabilities(module)
+
+    network_api = capabilities.get('network_api')
+    if network_api == 'cliconf':
+        module._connection = CachedConnection(module._socket_path)
+    else:
+        module.fail_json(msg='Invalid connection type %s' % network_api)
+
+    return module._connection
+
+
 def get_capabilities(module):
     if hasattr(module, '_huawei_s_capabilities'):
         return module._huawei_s_capabilities
@@ -120,12 +143,13 @@ def get_config(module, flags=None):
     try:
         return _DEVICE_CONFIGS[flag_str]
     except KeyError:
-        connection = get_connection(module)
         try:
-            out = connection.get_config(flags=flags)
+            out = run_batch(module, [{'method': 'get_config', 'args': {'flags': flags}}], compress=True)[0]
         except ConnectionError as exc:
             if section_filter:
-                # Some huawei_s devices don't understand `| section foo`
+                # Some huawei_s devices don't understand `| section foo`,
+                # the connection remembers it and rejects later attempts
+                # without a round trip to the device
                 out = get_config(module, flags=flags[:-1])
             else:
                 module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
@@ -135,13 +159,141 @@ def get_config(module, flags=None):
 
 
 def run_commands(module, commands, check_rc=True):
-    connection = get_connection(module)
     try:
-        return connection.run_commands(commands=commands, check_rc=check_rc)
+        request = {'method': 'run_commands', 'args': {'commands': commands, 'check_rc': check_rc}}
+        return run_batch(module, [request], compress=True)[0]
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
 
 
+def run_batch(module, requests, compress=False):
+    """Run several connection rpc calls in a single exchange, outputs the
+    connection sent compressed are returned as text
+    """
+    connection = get_connection(module)
+    results = connection.run_batch(requests=requests, compress=compress)
+    return [[decode_output(item) for item in result] if isinstance(result, list) else decode_output(result)
+            for result in results]
+
+
+def decode_output(output):
+    """Return the text of an output the connection sent zlib compressed
+    """
+    if isinstance(output, dict) and 'zlib' in output:
+        return to_text(zlib.decompress(base64.b64decode(output['zlib'])), errors='surrogate_then_replace')
+    return output
+
+
+class CachedConnection(Connection):
+    """A connection that remembers the output of the display commands it ran.
+
+    The outputs are kept until something may change the configuration: an
+    edit_* call or a command that is not read-only.
+    """
+
+    RPC_ARGS = {'get': ('command',), 'run_commands': ('commands', 'check_rc')}
+
+    def __init__(self, socket_path):
+        super(CachedConnection, self).__init__(socket_path)
+        self._outputs = dict()
+
+    def __rpc__(self, name, *args, **kwargs):
+        if name in self.RPC_ARGS and len(args) <= len(self.RPC_ARGS[name]):
+            request = {'method': name, 'args': dict(zip(self.RPC_ARGS[name], args), **kwargs)}
+            return self._run_batch([request])[0]
+        if name == 'run_batch' and not args:
+            return self._run_batch(**kwargs)
+
+        if name.startswith('edit_'):
+            self.invalidate()
+        return super(CachedConnection, self).__rpc__(name, *args, **kwargs)
+
+    def invalidate(self):
+        """Forget every output, the configuration may have changed
+        """
+        self._outputs.clear()
+        _DEVICE_CONFIGS.clear()
+
+    def _run_batch(self, requests=None, compress=False):
+        """Answer the get and run_commands requests from the outputs already
+        known and send what is left in a single rpc
+        """
+        results = [None] * len(requests)
+        pending = list()
+        for index, request in enumerate(requests):
+            commands, check_rc = self._get_commands(request)
+            if commands is None:
+                pending.append((index, None, request))
+                continue
+            outputs = [self._lookup(command, check_rc) for command in commands]
+            missing = [command for command, output in zip(commands, outputs) if output is None]
+            if not missing:
+                results[index] = outputs if request['method'] == 'run_commands' else outputs[0]
+            elif request['method'] == 'run_commands':
+                pending.append((index, outputs, {'method': 'run_commands', 'args': {'commands': missing, 'check_rc': check_rc}}))
+            else:
+                pending.append((index, outputs, request))
+
+        if pending:
+            if len(pending) == 1 and not compress:
+                # a single plain request does not need to be batched
+                request = pending[0][-1]
+                responses = [super(CachedConnection, self).__rpc__(request['method'], **request.get('args', {}))]
+            else:
+                responses = super(CachedConnection, self).__rpc__('run_batch', requests=[item[-1] for item in pending], compress=compress)
+            for (index, outputs, request), response in zip(pending, responses):
+                results[index] = self._store(request, response, outputs)
+
+        if not compress:
+            results = [[decode_output(item) for item in result] if isinstance(result, list) else decode_output(result)
+                       for result in results]
+        return results
+
+    def _get_commands(self, request):
+        """Return the commands of a request whose output can be kept
+        """
+        method, args = request['method'], request.get('args', {})
+        if method == 'get' and list(args) == ['command']:
+            return [args['command']], True
+        if method == 'run_commands' and set(args) <= set(['commands', 'check_rc']):
+            commands = to_list(args['commands'])
+            if not any(isinstance(command, dict) for command in commands):
+                return commands, args.get('check_rc', True)
+        return None, None
+
+    def _lookup(self, command, check_rc):
+        # an output checked for errors also answers an unchecked request
+        output = self._outputs.get((command, True))
+        if output is None and not check_rc:
+            output = self._outputs.get((command, False))
+        return output
+
+    def _store(self, request, response, outputs):
+        """Keep the outputs of the display commands of a request and merge
+        them with the outputs already known
+        """
+        args = request.get('args', {})
+        if request['method'] == 'get':
+            commands, fetched = [args.get('command')], [response]
+        elif request['method'] == 'run_commands':
+            commands, fetched = to_list(args.get('commands')), response
+        else:
+            return response
+
+        for command, output in zip(commands, fetched):
+            text = to_text(command['command'] if isinstance(command, dict) else command).strip()
+            if not text.startswith(READ_ONLY_COMMANDS):
+                self.invalidate()
+            elif text.startswith('display') and outputs is not None:
+                self._outputs[(command, args.get('check_rc', True))] = output
+
+        if outputs is None:
+            return response
+        fetched = iter(fetched)
+        outputs = [next(fetched) if output is None else output for output in outputs]
+        return outputs if request['method'] == 'run_commands' else outputs[0]
+
+
 def load_config(module, commands):
     connection = get_connection(module)
 
@@ -152,6 +304,16 @@ def load_config(module, commands):
         module.fail_json(msg=to_text(exc))
 
 
+def load_banner(module, banners, multiline_delimiter='"'):
+    connection = get_connection(module)
+
+    try:
+        resp = connection.edit_banner(candidate=json.dumps(banners), multiline_delimiter=multiline_delimiter)
+        return resp.get('response')
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc))
+
+
 def normalize_interface(name):
     """Return the normalized interface name
     """
@@ -13,6 +13,7 @@ from threading import RLock
 from ansible.module_utils.six import itervalues
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.common.config import NetworkConfig
+from ansible.module_utils.network.huawei_s.utils.config import ConfigIndex
 
 
 _registered_providers = {}
@@ -90,6 +91,14 @@ class CliProvider(ProviderBase):
 
     def get_config_context(self, config, path, indent=1):
         if config is not None:
+            path = to_list(path)
+            # the views of the configuration are indexed once
+            if getattr(self, '_config_index', None) is None or self._config_index.config is not config:
+                setattr(self, '_config_index', ConfigIndex(config))
+            if len(path) == 1 and indent == 1:
+                block = self._config_index.get_block(path[0])
+                return block + '\nend' if block is not None else None
+
             netcfg = NetworkConfig(indent=indent, contents=config)
             try:
                 config = netcfg.get_block_config(to_list(path))
@@ -0,0 +1,123 @@
+#
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# index of a VRP configuration
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+from collections import OrderedDict
+
+
+class ConfigIndex(object):
+    """ The configuration of a VRP device indexed by view
+
+    The configuration is parsed once. A view is a line starting at the first
+    column followed by its indented lines, views are looked up by their
+    command ('interface GigabitEthernet0/0/1') or all at once by their kind
+    ('interface', 'vlan', 'aaa'). Lines are looked up by prefix through an
+    index keyed by their first word.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._views = OrderedDict()
+        self._blocks = dict()
+        self._kinds = dict()
+        self._words = dict()
+        self._filters = dict()
+
+        lines = None
+        for raw in config.splitlines():
+            line = raw.strip()
+            # sections are separated by #, there are also some inside views
+            if not line or line.startswith('#'):
+                continue
+            if raw[0] != ' ':
+                lines = self._views.get(line)
+                if lines is None:
+                    lines = self._views[line] = list()
+                    self._blocks[line] = [raw.rstrip()]
+                    words = line.split(' ', 1)
+                    self._kinds.setdefault(words[0], OrderedDict())[words[-1]] = lines
+                self._words.setdefault(line.split(' ', 1)[0], list()).append(line)
+                block = self._blocks[line]
+            elif lines is not None:
+                lines.append(line)
+                block.append(raw.rstrip())
+
+    def get_view(self, command):
+        """ Return the lines of a view
+        :param command: The command of the view, e.g. 'interface Vlanif10'
+        :rtype: list
+        :returns: The stripped lines of the view or None if there is no such view
+        """
+        return self._views.get(command)
+
+    def get_views(self, kind):
+        """ Return every view of a kind
+        :param kind: The first word of the view commands, e.g. 'interface'
+        :rtype: OrderedDict
+        :returns: The lines of each view keyed by the rest of its command
+        """
+        return self._kinds.get(kind, OrderedDict())
+
+    def get_lines(self, prefix, view=None):
+        """ Return the lines starting with a prefix
+        :param prefix: The beginning of the lines, e.g. 'ip route-static'
+        :param view: Look in this view instead of the top level lines
+        :rtype: list
+        :returns: The stripped lines in configuration order
+        """
+        if view is not None:
+            lines = self._views.get(view, [])
+        else:
+            lines = self._words.get(prefix.split(' ', 1)[0], [])
+        return [line for line in lines if line.startswith(prefix)]
+
+    def get_value(self, prefix, view=None):
+        """ Return what follows the prefix on the last line starting with it
+        """
+        lines = self.get_lines(prefix, view)
+        if lines:
+            return lines[-1][len(prefix):].strip()
+
+    def get_block(self, command):
+        """ Return a view as it is in the configuration
+        :param command: The command of the view
+        :rtype: str
+        :returns: The view and its indented lines or None if there is no such view
+        """
+        block = self._blocks.get(command)
+        if block is not None:
+            return '\n'.join(block)
+
+    def filter(self, pipe, pattern):
+        """ Apply an include, exclude or begin output filter the way the
+        device does
+        :param pipe: The filter, include, exclude or begin
+        :param pattern: The regular expression of the filter
+        :rtype: str
+        :returns: The filtered configuration
+        """
+        key = (pipe, pattern)
+        if key not in self._filters:
+            regex = re.compile(pattern)
+            lines = self.config.split('\n')
+            if pipe == 'include':
+                lines = [line for line in lines if regex.search(line)]
+            elif pipe == 'exclude':
+                lines = [line for line in lines if not regex.search(line)]
+            else:
+                for index, line in enumerate(lines):
+                    if regex.search(line):
+                        lines = lines[index:]
+                        break
+                else:
+                    lines = []
+            self._filters[key] = '\n'.join(lines).strip()
+        return self._filters[key]
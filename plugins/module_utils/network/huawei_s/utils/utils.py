@@ -9,6 +9,8 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import re
+
 from ansible.module_utils.six import iteritems
 from ansible.module_utils.network.common.utils import is_masklen, to_netmask
 
@@ -220,3 +222,55 @@ def get_interface_type(interface):
         return '100GE'
     else:
         return 'unknown'
+
+
+def expand_vlan_range(vlans):
+    """Return the vlan ids of a VRP vlan list such as '10 20 to 30'
+    """
+    vlan_ids = []
+    tokens = vlans.split()
+    for index, token in enumerate(tokens):
+        if token == 'to':
+            vlan_ids.extend(range(int(tokens[index - 1]) + 1, int(tokens[index + 1])))
+        elif token.isdigit():
+            vlan_ids.append(int(token))
+    return vlan_ids
+
+
+class FieldExtractor(object):
+    """Extract several fields of a display output block
+
+    The regexes are compiled once. A field is the first group of the first
+    match of its regex, passed to its converter if it has one. Regexes
+    should start with a literal, re finds a literal with a fast substring
+    search but has to try a pattern or an alternation at every character,
+    so anchor them with a lookbehind rather than ^.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: Tuples of the field name, its regex and optionally a
+                       converter such as int
+        """
+        self._fields = []
+        for field in fields:
+            name, pattern = field[:2]
+            convert = field[2] if len(field) > 2 else None
+            self._fields.append((name, re.compile(pattern, re.M).search, convert))
+
+    def extract(self, data):
+        """
+        :param data: The text to extract the fields from
+        :rtype: dict
+        :returns: The value of each field, None when it is missing
+        """
+        fields = dict()
+        for name, search, convert in self._fields:
+            match = search(data)
+            if match is None:
+                fields[name] = None
+            elif convert is not None:
+                fields[name] = convert(match.group(1))
+            else:
+                fields[name] = match.group(1)
+        return fields
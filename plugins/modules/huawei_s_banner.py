@@ -88,8 +88,7 @@ commands:
     - string
 """
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.connection import exec_command
-from ansible.module_utils.network.huawei_s.huawei_s import load_config
+from ansible.module_utils.network.huawei_s.huawei_s import get_config, load_config, load_banner
 from ansible.module_utils.network.huawei_s.huawei_s import huawei_s_argument_spec, check_args
 import re
 
@@ -114,13 +113,9 @@ def map_obj_to_commands(updates, module):
 
 
 def map_config_to_obj(module):
-    rc, out, err = exec_command(module,
-                                'display current-configuration | begin header %s'
-                                % module.params['banner'])
+    out = get_config(module, flags=['| begin header %s' % module.params['banner']])
     if out:
         output = re.search(r'"(.*)"', out, re.S).group(1).strip()
-        #replace artifacts from output to normal new line symbol
-        output = output.replace('\u001b\u0019', '\n')
     else:
         output = None
     obj = {'banner': module.params['banner'], 'state': 'absent'}
@@ -173,7 +168,11 @@ def main():
 
     if commands:
         if not module.check_mode:
-            load_config(module, commands)
+            if module.params['state'] == 'present':
+                # the text goes through the prompt-synchronized banner rpc
+                load_banner(module, {'header %s information' % module.params['banner']: want['text'].strip()})
+            else:
+                load_config(module, commands)
 
         result['changed'] = True
 
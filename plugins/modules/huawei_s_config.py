@@ -40,6 +40,10 @@ notes:
   - Tested against VRP V200R010C00SPC600
   - Abbreviated commands are NOT idempotent, see
     L(Network FAQ,../network/user_guide/faq.html#why-do-the-config-modules-always-return-changed-true-with-abbreviated-commands).
+  - Large configurations can be pushed in windows of several lines per
+    round trip by setting the C(ansible_huawei_s_pipeline_window) variable,
+    or transferred to the device flash and executed as a batch file by
+    setting the C(ansible_huawei_s_file_load_threshold) variable.
 options:
   lines:
     description:
@@ -373,12 +377,31 @@ def get_running_config(module, current_config=None, flags=None):
     if not running:
         if not module.params['defaults'] and current_config:
             running = current_config
+        elif not flags and module.params['lines'] and is_interface_view(module.params['parents']):
+            running = get_section_config(module, module.params['parents'][0])
         else:
             running = get_config(module, flags=flags)
 
     return running
 
 
+def is_interface_view(parents):
+    return bool(parents) and parents[0].strip().startswith('interface ')
+
+
+def get_section_config(module, view):
+    """ Fetch the running configuration of a single interface view instead of
+    the whole running configuration, falling back to the whole configuration
+    if the device rejects the view
+    """
+    connection = get_connection(module)
+    try:
+        out = connection.get_config(flags=[view.strip()])
+    except ConnectionError:
+        return get_config(module)
+    return to_text(out, errors='surrogate_then_replace').strip()
+
+
 def save_config(module, result):
     result['changed'] = True
     if not module.check_mode:
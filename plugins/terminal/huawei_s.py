@@ -27,6 +27,47 @@ from ansible.utils.display import Display
 
 display = Display()
 
+#: Number of bytes at the end of a response searched for error messages, the
+#: device prints them right before the prompt following the failed command
+ERROR_WINDOW = 2048
+
+
+def ignore_case(pattern):
+    """
+    Spell every letter of a pattern as a class of its two cases, so that it
+    can share a single compiled regex with case sensitive patterns. Letters
+    inside character classes are not supported.
+    """
+    def _repl(match):
+        char = match.group(0)
+        if char.startswith(b'\\'):
+            return char
+        return b'[' + char.lower() + char.upper() + b']'
+
+    return re.sub(br'\\.|[A-Za-z]', _repl, pattern)
+
+
+class ErrorMatcher(object):
+    """
+    All the error patterns of the device compiled into one alternation and
+    guarded by a lower case keyword check, so a response is scanned once
+    instead of once per pattern, and only over its last ERROR_WINDOW bytes.
+    Every pattern must contain one of the keywords.
+    """
+
+    def __init__(self, patterns, keywords, window=ERROR_WINDOW):
+        self.pattern = b'|'.join([b'(?:' + pattern + b')' for pattern in patterns])
+        self._regex = re.compile(self.pattern)
+        self._keywords = keywords
+        self._window = window
+
+    def search(self, data):
+        pos = max(0, len(data) - self._window)
+        tail = data[pos:].lower()
+        if not any(keyword in tail for keyword in self._keywords):
+            return None
+        return self._regex.search(data, pos)
+
 
 class TerminalModule(TerminalBase):
 
@@ -44,28 +85,61 @@ class TerminalModule(TerminalBase):
     terminal_initial_answer = b'N'
 
     terminal_stderr_re = [
-        re.compile(br"% ?Error"),
-        re.compile(br"^% \w+", re.M),
-        re.compile(br"% ?Bad secret"),
-        re.compile(br"[\r\n%] Bad passwords"),
-        re.compile(br"invalid input", re.I),
-        re.compile(br"(?:incomplete|ambiguous) command", re.I),
-        re.compile(br"connection timed out", re.I),
-        re.compile(br"[^\r\n]+ not found"),
-        re.compile(br"'[^']' +returned error code: ?\d+"),
-        re.compile(br"Bad mask", re.I),
-        re.compile(br"% ?(\S+) ?overlaps with ?(\S+)", re.I),
-        re.compile(br"[%\S] ?Error: ?[\s]+", re.I),
-        re.compile(br"[%\S] ?Informational: ?[\s]+", re.I),
-        re.compile(br"Command authorization failed"),
-        re.compile(br"Error\[\d+\]: ", re.I),
-        re.compile(br"Error:", re.I),
-        re.compile(br'  ---- More ----\s*$', re.I)
+        ErrorMatcher([
+            br"% ?Error",
+            br"(?<![^\n])% \w+",
+            br"% ?Bad secret",
+            br"[\r\n%] Bad passwords",
+            ignore_case(br"invalid input"),
+            ignore_case(br"(?:incomplete|ambiguous) command"),
+            ignore_case(br"connection timed out"),
+            br"[^\r\n] not found",
+            br"'[^']' +returned error code: ?\d+",
+            ignore_case(br"Bad mask"),
+            ignore_case(br"% ?(\S+) ?overlaps with ?(\S+)"),
+            ignore_case(br"\S ?Error:\s"),
+            ignore_case(br"\S ?Informational:\s"),
+            br"Command authorization failed",
+            ignore_case(br"Error\[\d+\]: "),
+            ignore_case(br"Error:")
+        ], keywords=(b'%', b'error:', b'error[', b'returned error', b'not found', b'command',
+                     b'invalid input', b'timed out', b'bad passwords', b'bad mask',
+                     b'informational:'))
     ]
 
+    #: pager prompt shown when the output does not fit the screen length
+    terminal_pager_re = re.compile(br'  ---- More ----\s*$', re.I)
+
+    #: keystroke asking the pager for the next page
+    terminal_pager_answer = b' '
+
+    #: the pager prompt and the cursor moves that erase it once answered are
+    #: stripped from the response along with the ANSI codes
+    ansi_re = TerminalBase.ansi_re + [
+        re.compile(br'  ---- More ----(?:\x1b\[\d+D)?[ ]*(?:\x1b\[\d+D)?', re.I)
+    ]
+
+    def __init__(self, connection):
+        super(TerminalModule, self).__init__(connection)
+
+        #: whether screen-length 0 was accepted on the current shell
+        self.pager_disabled = False
+
+        if getattr(connection, 'transport', None) != 'huawei_s':
+            # only the huawei_s connection answers the pager, any other
+            # transport would wait for a prompt that never comes, so the
+            # pager is reported as an error and not stripped before the check
+            self.terminal_stderr_re = self.terminal_stderr_re + [self.terminal_pager_re]
+            self.ansi_re = TerminalBase.ansi_re
+
     def on_open_shell(self):
 
         try:
             self._exec_cli_command(b'screen-length 0 temporary')
+            self.pager_disabled = True
         except AnsibleConnectionFailure:
-            raise AnsibleConnectionFailure('unable to set terminal parameters')
+            self.pager_disabled = False
+            # the huawei_s connection answers the pager itself
+            if self._connection.transport != 'huawei_s':
+                raise AnsibleConnectionFailure('unable to set terminal parameters')
+            self._connection.queue_message('warning', 'unable to disable the pager, output will be read page by page')
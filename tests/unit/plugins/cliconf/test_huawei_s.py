@@ -0,0 +1,253 @@
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import socket
+import unittest
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils.six import text_type
+from ansible.plugins.cliconf.huawei_s import Cliconf
+from ansible.plugins.terminal.huawei_s import TerminalModule
+
+
+INFO_OUTPUT = (u'Info: The operation may take a few seconds. Please wait.\x1b[42D'
+               u'                                          \x1b[42D\r\n')
+
+
+class TestHuaweiSCliconf(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.get_prompt.return_value = b'[HUAWEI]'
+        self.connection.send.return_value = INFO_OUTPUT
+
+        self.cliconf = Cliconf(self.connection)
+        self.cliconf._session_shell = self.connection._ssh_shell
+        for option, value in (('huawei_s_pipeline_window', 1), ('huawei_s_file_load_threshold', 0)):
+            self.cliconf.set_option(option, value)
+
+    def test_send_command_returns_text(self):
+        out = self.cliconf.send_command('vlan 10')
+        self.assertIsInstance(out, text_type)
+        self.assertEqual(out, u'Info: The operation may take a few seconds. Please wait.' + u' ' * 42 + u'\r\n')
+        json.dumps(out)
+
+    def test_edit_config_response_is_serializable(self):
+        resp = self.cliconf.edit_config(candidate=['vlan 10', 'description uplink'])
+        self.assertEqual(resp['request'], ['vlan 10', 'description uplink'])
+        json.dumps(resp)
+
+    def test_edit_banner_response_is_serializable(self):
+        self.connection.get_prompt.side_effect = [b'[HUAWEI]'] * 4 + [b'<HUAWEI>']
+        resp = self.cliconf.edit_banner(candidate=json.dumps({'header login information': 'line 1\nline 2'}),
+                                        multiline_delimiter='"')
+        self.assertEqual(resp['request'], ['header login information "', 'line 1\nline 2', '"'])
+        json.dumps(resp)
+
+    def test_edit_banner_with_a_prompt_shaped_body_line(self):
+        prompts = [b'[~HUAWEI]']
+
+        def send(command, **kwargs):
+            if command.startswith(b'header'):
+                # the receive stops at the body line looking like a prompt
+                prompts.append(b'[WARNING]')
+                return u'header login information "\r\n[WARNING]'
+            prompts.append(b'<HUAWEI>')
+            return u''
+
+        def receive():
+            prompts.append(b'[*HUAWEI]')
+            return b' authorized access only\r\n"\r\n[*HUAWEI]'
+
+        self.connection.get_prompt.side_effect = lambda: prompts[-1]
+        self.connection.send.side_effect = send
+        self.connection.receive.side_effect = receive
+        resp = self.cliconf.edit_banner(candidate=json.dumps({'header login information': '[WARNING] authorized access only'}),
+                                        multiline_delimiter='"')
+        self.assertEqual(self.connection.receive.call_count, 1)
+        self.assertIn(u'authorized access only', resp['response'][0])
+
+
+class FakeShell(object):
+    """
+    SSH channel replaying the chunks of a device response, a read past the
+    last chunk times out like a quiet channel
+    """
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.sent = []
+        self.timeout = 30
+
+    def sendall(self, data):
+        self.sent.append(data)
+
+    def recv(self, size):
+        if not self.chunks:
+            raise socket.timeout()
+        return self.chunks.pop(0)
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+
+def strip(data):
+    for regex in TerminalModule.ansi_re:
+        data = regex.sub(b'', data)
+    return data
+
+
+class TestHuaweiSCliconfPipelining(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.get_option.return_value = 0.1
+        self.connection._strip.side_effect = strip
+
+        self.cliconf = Cliconf(self.connection)
+        for option, value in (('huawei_s_pipeline_window', 50), ('huawei_s_file_load_threshold', 0)):
+            self.cliconf.set_option(option, value)
+
+    def send_pipelined(self, commands, chunks):
+        self.connection._ssh_shell = FakeShell(chunks)
+        return self.cliconf._send_pipelined(commands)
+
+    def test_several_commands_per_window(self):
+        commands = ['vlan 10', 'description uplink', 'quit']
+        results = self.send_pipelined(commands, [
+            b'vlan 10\r\nInfo: This operation may take a few seconds.\r\n[HUA',
+            b'WEI-vlan10]description uplink\r\n[HUAWEI-vlan10]quit',
+            b'\r\n[HUAWEI]',
+        ])
+        self.connection.send.assert_called_once_with(b'vlan 10\rdescription uplink\rquit', sendonly=True)
+        self.assertEqual(results, [(u'Info: This operation may take a few seconds.', False), (u'', False), (u'', False)])
+        self.assertEqual(self.connection._matched_prompt, b'[HUAWEI]')
+
+    def test_error_in_the_middle_of_a_window(self):
+        results = self.send_pipelined(['interface GigabitEthernet0/0/1', 'port link-type bogus', 'quit'], [
+            b'interface GigabitEthernet0/0/1\r\n[HUAWEI-GigabitEthernet0/0/1]port link-type bogus\r\n',
+            b"                                         ^\r\nError: Wrong parameter found at '^' position.\r\n",
+            b'[HUAWEI-GigabitEthernet0/0/1]quit\r\n[HUAWEI]',
+        ])
+        self.assertEqual([error for out, error in results], [False, True, False])
+        self.assertIn(u"Error: Wrong parameter found at '^' position.", results[1][0])
+
+    def test_paged_response(self):
+        results = self.send_pipelined(['display vlan', 'display interface brief'], [
+            b'display vlan\r\nVID  Status\r\n1    enable\r\n  ---- More ----',
+            b'\x1b[16D                \x1b[16D10   enable\r\n[HUAWEI]display interface brief\r\n',
+            b'Interface  PHY  Protocol\r\n[HUAWEI]',
+        ])
+        self.assertEqual(self.connection._ssh_shell.sent, [TerminalModule.terminal_pager_answer])
+        self.assertEqual(results, [(u'VID  Status\r\n1    enable\r\n10   enable', False),
+                                   (u'Interface  PHY  Protocol', False)])
+
+    def test_long_command_echoed_line_wrapped(self):
+        description = 'description ' + 'x' * 100
+        results = self.send_pipelined(['interface Vlanif10', description, 'quit'], [
+            b'interface Vlanif10\r\n[HUAWEI-Vlanif10]' + description[:62].encode() + b'\r\n',
+            description[62:].encode() + b'\r\n[HUAWEI-Vlanif10]quit\r\n[HUAWEI]',
+        ])
+        self.assertEqual(results, [(u'', False)] * 3)
+
+    def test_unmatched_echo_fails(self):
+        with self.assertRaises(AnsibleConnectionFailure) as ctx:
+            self.send_pipelined(['vlan 10', 'description uplink'], [
+                b'vlan 10\r\n[HUAWEI-vlan10]descr uplink\r\n[HUAWEI-vlan10]',
+            ])
+        self.assertIn("'description uplink'", str(ctx.exception))
+        self.assertEqual(self.connection._ssh_shell.timeout, 30)
+
+    def test_edit_window_failure_reports_the_failing_line(self):
+        self.connection._ssh_shell = FakeShell([
+            b'interface GigabitEthernet0/0/1\r\n[HUAWEI-GigabitEthernet0/0/1]port link-type bogus\r\n',
+            b"Error: Wrong parameter found at '^' position.\r\n[HUAWEI-GigabitEthernet0/0/1]port default vlan 10\r\n",
+            b'[HUAWEI-GigabitEthernet0/0/1]quit\r\n[HUAWEI]',
+        ])
+        window = ['interface GigabitEthernet0/0/1', 'port link-type bogus', 'port default vlan 10', 'quit']
+        with self.assertRaises(AnsibleConnectionFailure) as ctx:
+            self.cliconf._edit_window(window, 10)
+        self.assertEqual(str(ctx.exception).splitlines(), [
+            u"line 12 of the candidate configuration 'port link-type bogus' failed: Error: Wrong parameter found at '^' position.",
+            u"lines 13 to 14 of the candidate configuration were sent after it: 'port default vlan 10', 'quit'",
+        ])
+
+    def test_edit_window_failure_on_the_last_line(self):
+        self.connection._ssh_shell = FakeShell([
+            b'vlan 10\r\n[HUAWEI-vlan10]description uplink\r\n[HUAWEI-vlan10]bogus\r\n',
+            b"Error: Unrecognized command found at '^' position.\r\n[HUAWEI-vlan10]",
+        ])
+        with self.assertRaises(AnsibleConnectionFailure) as ctx:
+            self.cliconf._edit_window(['vlan 10', 'description uplink', 'bogus'])
+        self.assertEqual(str(ctx.exception),
+                         u"line 3 of the candidate configuration 'bogus' failed: Error: Unrecognized command found at '^' position.")
+
+
+class TestHuaweiSCliconfLoadFile(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = MagicMock()
+        self.connection.get_option.return_value = 0.1
+        self.connection._strip.side_effect = strip
+
+        # sftp stand-in keeping the content of the transferred batch file
+        self.transferred = {}
+        sftp = self.connection.paramiko_conn._connect_uncached.return_value.open_sftp.return_value.__enter__.return_value
+        sftp.put.side_effect = self.put
+
+        self.cliconf = Cliconf(self.connection)
+        for option, value in (('huawei_s_file_load_threshold', 3), ('huawei_s_file_transfer_proto', 'sftp')):
+            self.cliconf.set_option(option, value)
+
+    def put(self, source, destination):
+        with open(source) as f:
+            self.transferred[destination] = f.read()
+
+    def load_file(self, lines, chunks):
+        self.connection._ssh_shell = FakeShell(chunks)
+        return self.cliconf._load_file(lines)
+
+    def test_load_file(self):
+        lines = ['vlan 10', 'description uplink', 'quit']
+        out = self.load_file(lines, [
+            b'execute ansible_candidate.bat\r\n[HUAWEI]vlan 10\r\n',
+            b'[HUAWEI-vlan10]',
+            b'description uplink\r\n[HUAWEI-vlan10]quit\r\n[HUAWEI]',
+        ])
+        self.assertEqual(self.transferred, {'ansible_candidate.bat': 'vlan 10\ndescription uplink\nquit\n'})
+        self.connection.send.assert_called_once_with(b'execute ansible_candidate.bat', sendonly=True)
+        self.assertTrue(out.endswith(u'[HUAWEI-vlan10]quit\r\n[HUAWEI]'))
+        self.assertEqual(self.connection._matched_prompt, b'[HUAWEI]')
+
+    def test_load_file_maps_errors_to_candidate_lines(self):
+        with self.assertRaises(AnsibleConnectionFailure) as ctx:
+            self.load_file(['vlan 10', 'bogus', 'quit'], [
+                b'execute ansible_candidate.bat\r\n[HUAWEI]vlan 10\r\n[HUAWEI-vlan10]bogus\r\n',
+                b"Error: Unrecognized command found at '^' position.\r\n" + b'Info: filler\r\n' * 200,
+                b'[HUAWEI-vlan10]quit\r\n[HUAWEI]',
+            ])
+        self.assertEqual(str(ctx.exception),
+                         u"line 2 of the candidate configuration 'bogus' failed: Error: Unrecognized command found at '^' position.")
+
+    def test_load_file_transfer_failure(self):
+        self.connection.paramiko_conn._connect_uncached.side_effect = IOError('connection refused')
+        with self.assertRaises(AnsibleConnectionFailure) as ctx:
+            self.load_file(['vlan 10', 'description uplink', 'quit'], [])
+        self.assertEqual(str(ctx.exception), u'unable to transfer ansible_candidate.bat to the device: connection refused')
+        self.assertFalse(self.connection.send.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import unittest
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from ansible.module_utils.network.huawei_s.huawei_s import CachedConnection
+from ansible.module_utils.network.huawei_s.facts.facts import Facts
+
+
+CURRENT_CONFIGURATION = u"""\
+!Software Version V200R011C10SPC500
+#
+sysname HUAWEI
+#
+vlan batch 10 20
+#
+lacp priority 100
+#
+vlan 10
+ description uplink ports
+vlan 20
+ shutdown
+#
+interface Vlanif1
+#
+interface Eth-Trunk1
+ port link-type trunk
+ port trunk allow-pass vlan 2 to 4094
+#
+interface Eth-Trunk2
+ port link-type trunk
+ port trunk allow-pass vlan 2 to 4094
+ mode lacp
+ max active-linknumber 4
+#
+interface GigabitEthernet0/0/1
+ eth-trunk 1
+#
+interface GigabitEthernet0/0/2
+ eth-trunk 1
+#
+interface GigabitEthernet0/0/3
+ eth-trunk 2
+#
+interface GigabitEthernet0/0/4
+ eth-trunk 2
+#
+interface GigabitEthernet0/0/5
+ port link-type access
+ port default vlan 10
+#
+interface GigabitEthernet0/0/6
+#
+return
+"""
+
+DISPLAY_VLAN = u"""\
+The total number of vlans is : 3
+--------------------------------------------------------------------------------
+U: Up;         D: Down;         TG: Tagged;         UT: Untagged;
+MP: Vlan-mapping;               ST: Vlan-stacking;
+#: ProtocolTransparent-vlan;    *: Management-vlan;
+--------------------------------------------------------------------------------
+
+VID  Type    Ports
+--------------------------------------------------------------------------------
+1    common  UT:GE0/0/6(U)
+10   common  UT:GE0/0/5(U)     TG:Eth-Trunk1(U)  Eth-Trunk2(U)
+20   common  TG:Eth-Trunk1(U)  Eth-Trunk2(U)
+
+VID  Status  Property      MAC-LRN Statistics Description
+--------------------------------------------------------------------------------
+1    enable  default       enable  disable    VLAN 0001
+10   enable  default       enable  disable    uplink ports
+20   disable default       enable  disable    VLAN 0020
+"""
+
+DISPLAY_PORT_VLAN = u"""\
+Port                    Link Type    PVID  Trunk VLAN List
+-------------------------------------------------------------------------------
+Eth-Trunk1              trunk        1     1-4094
+Eth-Trunk2              trunk        1     1-4094
+GigabitEthernet0/0/5    access       10    -
+GigabitEthernet0/0/6    desirable    1     1-4094
+"""
+
+DISPLAY_ETH_TRUNK = u"""\
+Eth-Trunk1's state information is:
+WorkingMode: NORMAL           Hash arithmetic: According to SIP-XOR-DIP
+System Priority: 100          System ID: 4c1f-cc00-0001
+Least Active-linknumber: 1    Max Bandwidth-affected-linknumber: 8
+Operate status: up            Number Of Up Port In Trunk: 2
+--------------------------------------------------------------------------------
+PortName                      Status      Weight
+GigabitEthernet0/0/1          Up          1
+GigabitEthernet0/0/2          Up          1
+
+Eth-Trunk2's state information is:
+Local:
+LAG ID: 2                   WorkingMode: LACP
+Preempt Delay: Disabled     Hash arithmetic: According to SIP-XOR-DIP
+System Priority: 100        System ID: 4c1f-cc00-0001
+Least Active-linknumber: 1  Max Active-linknumber: 4
+Operate status: up          Number Of Up Port In Trunk: 2
+--------------------------------------------------------------------------------
+ActorPortName          Status   PortType PortPri PortNo PortKey PortState Weight
+GigabitEthernet0/0/3   Selected 1GE      32768   4      561     10111100  1
+GigabitEthernet0/0/4   Selected 1GE      32768   5      561     10111100  1
+
+Partner:
+--------------------------------------------------------------------------------
+ActorPortName          SysPri   SystemID        PortPri PortNo PortKey PortState
+GigabitEthernet0/0/3   32768    4c1f-cc00-0002  32768   4      561     10111100
+GigabitEthernet0/0/4   32768    4c1f-cc00-0002  32768   5      561     10111100
+"""
+
+OUTPUTS = {
+    'display current-configuration': CURRENT_CONFIGURATION,
+    'display vlan': DISPLAY_VLAN,
+    'display port vlan': DISPLAY_PORT_VLAN,
+    'display eth-trunk': DISPLAY_ETH_TRUNK,
+}
+
+
+class TestHuaweiSFactsSource(unittest.TestCase):
+    """
+    Both facts sources must report the same facts for the same device
+    """
+
+    def get_facts(self, resource, facts_source):
+        commands = []
+
+        def run_batch(requests, compress=False):
+            responses = []
+            for request in requests:
+                commands.extend(request['args']['commands'])
+                responses.append([OUTPUTS[command] for command in request['args']['commands']])
+            return responses
+
+        module = MagicMock()
+        module.params = {'gather_subset': ['!all', '!min'], 'gather_network_resources': [resource]}
+        module._huawei_s_capabilities = {'facts_source': facts_source}
+        module._connection = MagicMock()
+        module._connection.__class__ = CachedConnection
+        module._connection.run_batch.side_effect = run_batch
+
+        facts = Facts(module).get_facts()[0]['ansible_network_resources'][resource]
+        return facts, commands
+
+    def assert_same_facts(self, resource):
+        display, display_commands = self.get_facts(resource, 'display')
+        config, config_commands = self.get_facts(resource, 'config')
+        self.assertTrue(display)
+        self.assertEqual(config, display)
+        return display_commands, config_commands
+
+    def test_vlans(self):
+        self.assertEqual(self.assert_same_facts('vlans'), (['display vlan'], ['display current-configuration']))
+
+    def test_l2_interfaces(self):
+        # the default link type is not part of the configuration
+        self.assertEqual(self.assert_same_facts('l2_interfaces'), (['display port vlan'], ['display port vlan']))
+
+    def test_lag_interfaces(self):
+        self.assertEqual(self.assert_same_facts('lag_interfaces'), (['display eth-trunk'], ['display current-configuration']))
+
+    def test_lacp_interfaces(self):
+        self.assertEqual(self.assert_same_facts('lacp_interfaces'), (['display eth-trunk'], ['display current-configuration']))
+
+
+if __name__ == '__main__':
+    unittest.main()